@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+'''
+Measure the time taken to merge the classes of the nodes of a synthetic model,
+and to render its inventory, with and without the class merge cache. Every
+node lists CLASSES classes, the first SHARED of them are the same for all
+nodes, the others are taken from a pool in an order which differs between
+groups of ten nodes.
+
+  python benchmarks/class_merge.py [NODES [CLASSES [SHARED]]]
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import yaml
+
+from reclass import get_storage
+from reclass.core import Core
+from reclass.settings import Settings
+
+PARAMETERS = 60
+
+
+def make_class(name):
+    # scalars, strings with references and small lists, in dicts of ten keys
+    parameters = {}
+    for i in range(PARAMETERS):
+        group = parameters.setdefault('group{0}'.format(i // 10), {})
+        if i % 3 == 0:
+            group['{0}_{1}'.format(name, i)] = i
+        elif i % 3 == 1:
+            group['url{0}'.format(i)] = 'http://${{group0:host}}/{0}'.format(name)
+        else:
+            group['packages{0}'.format(i)] = ['{0}-{1}'.format(name, i)]
+    parameters['group0']['host'] = name
+    return {'parameters': parameters}
+
+
+def make_model(basedir, nodes, classes, shared):
+    pool = ['role{0}'.format(i) for i in range(max(classes - shared, 1) * 2)]
+    for name in ['shared{0}'.format(i) for i in range(shared)] + pool:
+        with open(os.path.join(basedir, 'classes', name + '.yml'), 'w') as fp:
+            yaml.safe_dump(make_class(name), fp)
+    for n in range(nodes):
+        # the nodes of a group of ten have the same roles, the groups take
+        # them from the pool in different orders
+        group = n // 10
+        listed = ['shared{0}'.format(i) for i in range(shared)]
+        listed += [pool[(group + i * (group % 3 + 1)) % len(pool)] for i in range(classes - shared)]
+        listed = sorted(set(listed), key=listed.index)
+        with open(os.path.join(basedir, 'nodes', 'node{0}.yml'.format(n)), 'w') as fp:
+            yaml.safe_dump({'classes': listed, 'parameters': {'name': 'node{0}'.format(n)}}, fp)
+
+
+def measure(basedir, settings):
+    storage = get_storage('yaml_fs', os.path.join(basedir, 'nodes'),
+                          os.path.join(basedir, 'classes'), False)
+    core = Core(storage, [], Settings(settings))
+    nodenames = list(storage.enumerate_nodes())
+    # read all the files first, only the merging is measured
+    for nodename in nodenames:
+        core._node_entity(nodename)
+    core = Core(storage, [], Settings(settings))
+    start = time.time()
+    for nodename in nodenames:
+        core._node_entity(nodename)
+    merged = time.time()
+    core.inventory()
+    return merged - start, time.time() - merged, len(core._merge_cache)
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    classes = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    shared = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    basedir = tempfile.mkdtemp()
+    try:
+        os.mkdir(os.path.join(basedir, 'nodes'))
+        os.mkdir(os.path.join(basedir, 'classes'))
+        make_model(basedir, nodes, classes, shared)
+        print('{0} nodes, {1} classes, {2} shared'.format(nodes, classes, shared))
+        for name, settings in (('without cache', {}),
+                               ('with cache', {'class_merge_cache': 100})):
+            print('{0:<14} merge {1:.2f}s, inventory {2:.2f}s, {3} merged '
+                  'prefixes kept'.format(name, *measure(basedir, settings)))
+    finally:
+        shutil.rmtree(basedir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+'''
+Measure the memory used by the merged, uninterpolated parameters of a node,
+per leaf of the parameter tree. Needs Python 3 for tracemalloc.
+
+  python benchmarks/memory.py [LEAVES]
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import gc
+import sys
+import tracemalloc
+
+from reclass.datatypes import Parameters
+from reclass.settings import Settings
+
+
+def make_mapping(leaves, layer):
+    # a mix of the leaves found in models: scalars, references, composite
+    # strings and small lists, in dicts of ten keys
+    mapping = {}
+    for i in range(leaves // 4):
+        group = mapping.setdefault('group{0}'.format(i // 10), {})
+        group['int{0}'.format(i)] = i + layer
+        group['str{0}'.format(i)] = 'value{0}'.format(i % 50)
+        group['ref{0}'.format(i)] = '${{group0:int{0}}}'.format(i % 10)
+        group['list{0}'.format(i)] = ['item{0}'.format(layer)]
+    return mapping
+
+
+def build(leaves, settings):
+    # two classes and a node merged together, like a node with two classes
+    params = Parameters(make_mapping(leaves, 0), settings, 'yaml_fs:///classes/a.yml')
+    for layer, uri in enumerate(('yaml_fs:///classes/b.yml', 'yaml_fs:///nodes/n.yml')):
+        params.merge(Parameters(make_mapping(leaves, layer + 1), settings, uri))
+    return params
+
+
+def main():
+    leaves = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    settings = Settings()
+    # fill the parse cache, which is shared by all nodes
+    build(leaves, settings)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    params = build(leaves, settings)
+    gc.collect()
+    after = tracemalloc.take_snapshot()
+    size = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    print('{0} leaves merged from 3 entities: {1:.0f} bytes per leaf'.format(
+        leaves, size / leaves))
+    del params
+
+
+if __name__ == '__main__':
+    main()
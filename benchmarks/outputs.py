@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+'''
+Measure the time taken by every outputter to write a synthetic inventory,
+and the time taken to read the output back, where a reader is installed.
+
+  python benchmarks/outputs.py [NODES]
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import pickle
+import sys
+import time
+
+import yaml
+
+from reclass.output import OutputLoader
+
+FORMATS = ('yaml', 'json', 'fastjson', 'msgpack', 'cbor', 'pickle')
+
+
+def make_nodeinfo(n):
+    # a node with 4 classes and about 100 parameters, scalars, strings and
+    # small lists in dicts of ten keys
+    parameters = {}
+    for i in range(25):
+        group = parameters.setdefault('group{0}'.format(i // 10), {})
+        group['port{0}'.format(i)] = 8000 + i
+        group['host{0}'.format(i)] = 'node{0}.example.org'.format(n)
+        group['enabled{0}'.format(i)] = i % 2 == 0
+        group['packages{0}'.format(i)] = ['pkg{0}'.format(i), 'pkg{0}-common'.format(i)]
+    classes = ['common', 'role{0}'.format(n % 10), 'site{0}'.format(n % 3), 'node{0}'.format(n)]
+    return {'__reclass__': {'node': 'node{0}'.format(n), 'name': 'node{0}'.format(n),
+                            'uri': 'yaml_fs:///srv/reclass/nodes/node{0}.yml'.format(n),
+                            'environment': 'base', 'timestamp': 'Thu Jan  1 00:00:00 1970'},
+            'classes': classes,
+            'applications': ['role{0}'.format(n % 10)],
+            'parameters': parameters,
+            'exports': {},
+            'environment': 'base'}
+
+
+def make_inventory(nodes):
+    inventory = {'__reclass__': {'timestamp': 'Thu Jan  1 00:00:00 1970'},
+                 'nodes': {}, 'classes': {}, 'applications': {}}
+    for n in range(nodes):
+        name = 'node{0}'.format(n)
+        nodeinfo = make_nodeinfo(n)
+        inventory['nodes'][name] = nodeinfo
+        for c in nodeinfo['classes']:
+            inventory['classes'].setdefault(c, []).append(name)
+        for a in nodeinfo['applications']:
+            inventory['applications'].setdefault(a, []).append(name)
+    return inventory
+
+
+def _optional_loader(module, function):
+    try:
+        return getattr(__import__(module), function)
+    except ImportError:
+        return None
+
+
+def _yaml_load(text):
+    return yaml.load(text, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+
+LOADERS = {'yaml': _yaml_load,
+           'json': json.loads,
+           'fastjson': _optional_loader('orjson', 'loads') or json.loads,
+           'msgpack': _optional_loader('msgpack', 'unpackb'),
+           'cbor': _optional_loader('cbor2', 'loads'),
+           'pickle': pickle.loads}
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    inventory = make_inventory(nodes)
+    print('{0} nodes'.format(nodes))
+    print('{0:<10} {1:>10} {2:>10} {3:>10}'.format('format', 'MB', 'write s', 'read s'))
+    for fmt in FORMATS:
+        outputter = OutputLoader(fmt).load()()
+        start = time.time()
+        text = outputter.dump(inventory)
+        written = time.time()
+        loader = LOADERS[fmt]
+        if loader is None:
+            read = '-'
+        else:
+            loader(text)
+            read = '{0:.2f}'.format(time.time() - written)
+        size = len(text.encode('utf-8') if not outputter.binary else text)
+        print('{0:<10} {1:>10.1f} {2:>10.2f} {3:>10}'.format(
+            fmt, size / 1e6, written - start, read))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+'''
+Measure the time taken to merge and interpolate parameters when the same
+keys are set again at every level of a deep class hierarchy.
+
+  python benchmarks/overrides.py [LEVELS]
+'''
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import sys
+import time
+
+from reclass.datatypes import Parameters
+from reclass.settings import Settings
+
+
+def make_mapping(level):
+    # a scalar, a list and a string with a reference set by every class; the
+    # reference keeps the urls in a ValueList until interpolation
+    return {'version': level,
+            'url': 'http://${host}/v' + str(level),
+            'packages': ['pkg{0}'.format(level)],
+            'host': 'host{0}'.format(level)}
+
+
+def main():
+    levels = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    settings = Settings()
+    mappings = [Parameters(make_mapping(level), settings, 'class{0}'.format(level))
+                for level in range(levels)]
+    start = time.time()
+    params = Parameters(None, settings, 'node')
+    for mapping in mappings:
+        params.merge(mapping)
+    merged = time.time()
+    params.interpolate()
+    end = time.time()
+    print('{0} levels: merge {1:.2f}s, interpolate {2:.2f}s'.format(
+        levels, merged - start, end - merged))
+
+
+if __name__ == '__main__':
+    main()
@@ -26,3 +26,28 @@ def output(data, fmt, pretty_print=False, no_refs=False):
     output_class = OutputLoader(fmt).load()
     outputter = output_class()
     return outputter.dump(data, pretty_print=pretty_print, no_refs=no_refs)
+
+def _output_file(outputter, fp):
+    # the binary outputters write to the buffer underneath a text file
+    if outputter.binary:
+        return getattr(fp, 'buffer', fp)
+    return fp
+
+def write_output(data, fp, fmt, pretty_print=False, no_refs=False):
+    outputter = OutputLoader(fmt).load()()
+    text = outputter.dump(data, pretty_print=pretty_print, no_refs=no_refs)
+    if outputter.binary:
+        fp.flush()
+        _output_file(outputter, fp).write(text)
+    else:
+        print(text, file=fp)
+
+def output_stream(items, fp, fmt, pretty_print=False, no_refs=False):
+    outputter = OutputLoader(fmt).load()()
+    if outputter.binary:
+        fp.flush()
+    outputter.dump_stream(items, _output_file(outputter, fp),
+                          pretty_print=pretty_print, no_refs=no_refs)
+    if not outputter.binary:
+        # like print, end the output with a newline
+        print(file=fp)
@@ -23,13 +23,37 @@ import os, sys, posix, optparse
 
 from six import iteritems
 
-from reclass import get_storage, output
+from reclass import get_storage, write_output
 from reclass.core import Core
 from reclass.errors import ReclassException
 from reclass.config import find_and_read_configfile, get_options
 from reclass.version import *
 from reclass.constants import MODE_NODEINFO
 from reclass.settings import Settings
+from reclass.server import query
+
+def host_vars(nodeinfo):
+    # Massage and shift the data like Ansible wants it
+    nodeinfo['parameters']['__reclass__'] = nodeinfo['__reclass__']
+    for i in ('classes', 'applications'):
+        nodeinfo['parameters']['__reclass__'][i] = nodeinfo[i]
+    return nodeinfo['parameters']
+
+
+def inventory_groups(inventory, applications_postfix):
+    # Groups are the set of classes plus the set of applications with the
+    # postfix added. The host vars of all nodes are included under _meta, so
+    # Ansible does not call the adapter again with --host for every node
+    groups = inventory['classes']
+    apps = inventory['applications']
+    if applications_postfix:
+        groups.update([(k + applications_postfix, v) for (k, v) in iteritems(apps)])
+    else:
+        groups.update(apps)
+    groups['_meta'] = {'hostvars': dict((n, host_vars(d))
+                                        for (n, d) in iteritems(inventory['nodes']))}
+    return groups
+
 
 def cli():
     try:
@@ -66,38 +90,29 @@ def cli():
                               add_options_cb=add_ansible_options_group,
                               defaults=defaults)
 
-        storage = get_storage(options.storage_type,
-                              options.nodes_uri,
-                              options.classes_uri,
-                              options.compose_node_name)
-        class_mappings = defaults.get('class_mappings')
-        defaults.update(vars(options))
-        settings = Settings(defaults)
-        reclass = Core(storage, class_mappings, settings)
+        data = None
+        if options.socket_path:
+            data = query(options.socket_path, options.hostname)
+        if data is None:
+            storage = get_storage(options.storage_type,
+                                  options.nodes_uri,
+                                  options.classes_uri,
+                                  options.compose_node_name)
+            class_mappings = defaults.get('class_mappings')
+            defaults.update(vars(options))
+            settings = Settings(defaults)
+            reclass = Core(storage, class_mappings, settings)
+            if options.mode == MODE_NODEINFO:
+                data = reclass.nodeinfo(options.hostname)
+            else:
+                data = reclass.inventory()
 
         if options.mode == MODE_NODEINFO:
-            data = reclass.nodeinfo(options.hostname)
-            # Massage and shift the data like Ansible wants it
-            data['parameters']['__reclass__'] = data['__reclass__']
-            for i in ('classes', 'applications'):
-                data['parameters']['__reclass__'][i] = data[i]
-            data = data['parameters']
-
+            data = host_vars(data)
         else:
-            data = reclass.inventory()
-            # Ansible inventory is only the list of groups. Groups are the set
-            # of classes plus the set of applications with the postfix added:
-            groups = data['classes']
-            apps = data['applications']
-            if options.applications_postfix:
-                postfix = options.applications_postfix
-                groups.update([(k + postfix, v) for (k, v) in iteritems(apps)])
-            else:
-                groups.update(apps)
-
-            data = groups
+            data = inventory_groups(data, options.applications_postfix)
 
-        print(output(data, options.output, options.pretty_print, options.no_refs))
+        write_output(data, sys.stdout, options.output, options.pretty_print, options.no_refs)
 
     except ReclassException as e:
         e.exit_with_message(sys.stderr)
@@ -11,19 +11,58 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import os, sys, posix
+import os, sys, posix, time
 
 from six import iteritems
 
-from reclass import get_storage, output, get_path_mangler
+from reclass import get_storage, get_path_mangler, write_output
 from reclass.core import Core
 from reclass.errors import ReclassException
 from reclass.config import find_and_read_configfile, get_options
 from reclass.constants import MODE_NODEINFO
 from reclass.defaults import *
 from reclass.settings import Settings
+from reclass.server import query
+from reclass.utils.lrucache import LRUCache
 from reclass.version import *
 
+# The Core objects of the inventories used so far, with their storage and its
+# stamp, so that the classes read for one minion are used for the next ones
+# until a file of the inventory changes. Taking the stamp walks the whole
+# inventory, so it is taken again at most every _STAMP_INTERVAL seconds, and
+# only the _MAX_CORES inventories used last are kept.
+_cores = LRUCache()
+_MAX_CORES = 8
+_STAMP_INTERVAL = 5
+
+def _get_core(storage_type, inventory_base_uri, nodes_uri, classes_uri,
+              compose_node_name, class_mappings, settings, input_data=None):
+    key = (storage_type, inventory_base_uri, nodes_uri, classes_uri,
+           compose_node_name, tuple(class_mappings or ()), settings.fingerprint)
+    now = time.time()
+    cached = _cores.get(key)
+    if cached is not None:
+        stamp, checked, storage, reclass = cached
+        if not 0 <= now - checked < _STAMP_INTERVAL:
+            if stamp == storage.stamp():
+                _cores.put(key, (stamp, now, storage, reclass), _MAX_CORES)
+            else:
+                cached = None
+    if cached is None:
+        path_mangler = get_path_mangler(storage_type)
+        n, c = path_mangler(inventory_base_uri, nodes_uri, classes_uri)
+        storage = get_storage(storage_type, n, c, compose_node_name)
+        reclass = Core(storage, class_mappings, settings)
+        stamp = storage.stamp()
+        # nothing is kept if the storage cannot tell when it changes
+        if stamp is not None:
+            _cores.put(key, (stamp, now, storage, reclass), _MAX_CORES)
+    if input_data is not None:
+        # the pillar of the minion is merged into its node, so only the
+        # entities read by the storage are shared with the other minions
+        reclass = Core(storage, class_mappings, settings, input_data=input_data)
+    return reclass
+
 def ext_pillar(minion_id, pillar,
                storage_type=OPT_STORAGE_TYPE,
                inventory_base_uri=OPT_INVENTORY_BASE_URI,
@@ -32,18 +71,23 @@ def ext_pillar(minion_id, pillar,
                class_mappings=None,
                propagate_pillar_data_to_reclass=False,
                compose_node_name=OPT_COMPOSE_NODE_NAME,
+               socket_path=OPT_SOCKET_PATH,
                **kwargs):
 
-    path_mangler = get_path_mangler(storage_type)
-    nodes_uri, classes_uri = path_mangler(inventory_base_uri, nodes_uri, classes_uri)
-    storage = get_storage(storage_type, nodes_uri, classes_uri, compose_node_name)
-    input_data = None
-    if propagate_pillar_data_to_reclass:
-        input_data = pillar
-    settings = Settings(kwargs)
-    reclass = Core(storage, class_mappings, settings, input_data=input_data)
+    data = None
+    # the server knows nothing about the pillar of the minion, so it
+    # cannot be used when pillar data has to be propagated
+    if socket_path and not propagate_pillar_data_to_reclass:
+        data = query(socket_path, minion_id)
+    if data is None:
+        input_data = None
+        if propagate_pillar_data_to_reclass:
+            input_data = pillar
+        reclass = _get_core(storage_type, inventory_base_uri, nodes_uri,
+                            classes_uri, compose_node_name, class_mappings,
+                            Settings(kwargs), input_data=input_data)
+        data = reclass.nodeinfo(minion_id)
 
-    data = reclass.nodeinfo(minion_id)
     params = data.get('parameters', {})
     params['__reclass__'] = {}
     params['__reclass__']['nodename'] = minion_id
@@ -56,25 +100,30 @@ def ext_pillar(minion_id, pillar,
 def top(minion_id, storage_type=OPT_STORAGE_TYPE,
         inventory_base_uri=OPT_INVENTORY_BASE_URI, nodes_uri=OPT_NODES_URI,
         classes_uri=OPT_CLASSES_URI, class_mappings=None, compose_node_name=OPT_COMPOSE_NODE_NAME,
-        **kwargs):
-
-    path_mangler = get_path_mangler(storage_type)
-    nodes_uri, classes_uri = path_mangler(inventory_base_uri, nodes_uri, classes_uri)
-    storage = get_storage(storage_type, nodes_uri, classes_uri, compose_node_name)
-    settings = Settings(kwargs)
-    reclass = Core(storage, class_mappings, settings, input_data=None)
+        socket_path=OPT_SOCKET_PATH, **kwargs):
+
+    data = None
+    if socket_path:
+        data = query(socket_path, minion_id)
+    if data is None:
+        reclass = _get_core(storage_type, inventory_base_uri, nodes_uri,
+                            classes_uri, compose_node_name, class_mappings,
+                            Settings(kwargs))
+        # the parameters are not needed for the top data
+        if minion_id is not None:
+            data = reclass.applications_nodeinfo(minion_id)
+        else:
+            data = reclass.applications_inventory()
 
     # if the minion_id is not None, then return just the applications for the
     # specific minion, otherwise return the entire top data (which we need for
     # CLI invocations of the adapter):
     if minion_id is not None:
-        data = reclass.nodeinfo(minion_id)
         applications = data.get('applications', [])
         env = data['environment']
         return {env: applications}
 
     else:
-        data = reclass.inventory()
         nodes = {}
         for (node_id, node_data) in iteritems(data['nodes']):
             env = node_data['environment']
@@ -128,7 +177,7 @@ def cli():
                        class_mappings=class_mappings,
                        **defaults)
 
-        print(output(data, options.output, options.pretty_print, options.no_refs))
+        write_output(data, sys.stdout, options.output, options.pretty_print, options.no_refs)
 
     except ReclassException as e:
         e.exit_with_message(sys.stderr)
@@ -13,13 +13,14 @@ from __future__ import unicode_literals
 
 import sys, os, posix
 
-from reclass import get_storage, output
+from reclass import get_storage, output_stream, write_output
 from reclass.core import Core
 from reclass.settings import Settings
 from reclass.config import find_and_read_configfile, get_options
 from reclass.defaults import *
 from reclass.errors import ReclassException
-from reclass.constants import MODE_NODEINFO
+from reclass.constants import MODE_NODEINFO, MODE_SERVE
+from reclass.server import query, serve
 from reclass.version import *
 
 def main():
@@ -30,22 +31,42 @@ def main():
                    }
         defaults.update(find_and_read_configfile())
 
-        options = get_options(RECLASS_NAME, VERSION, DESCRIPTION, defaults=defaults)
-        storage = get_storage(options.storage_type,
-                              options.nodes_uri,
-                              options.classes_uri,
-                              options.compose_node_name)
+        options = get_options(RECLASS_NAME, VERSION, DESCRIPTION,
+                              serve_longopt='--serve', since_longopt='--since',
+                              stream_longopt='--stream',
+                              defaults=defaults)
         class_mappings = defaults.get('class_mappings')
         defaults.update(vars(options))
-        settings = Settings(defaults)
-        reclass = Core(storage, class_mappings, settings)
 
-        if options.mode == MODE_NODEINFO:
-            data = reclass.nodeinfo(options.nodename)
-        else:
-            data = reclass.inventory()
+        def make_core():
+            storage = get_storage(options.storage_type,
+                                  options.nodes_uri,
+                                  options.classes_uri,
+                                  options.compose_node_name)
+            settings = Settings(defaults)
+            return Core(storage, class_mappings, settings)
 
-        print(output(data, options.output, options.pretty_print, options.no_refs))
+        if options.mode == MODE_SERVE:
+            serve(options.socket_path, make_core)
+            sys.exit(posix.EX_OK)
+
+        data = None
+        # the server does not keep the state of --since, which has to be
+        # updated by every run
+        if options.socket_path and not options.state_file:
+            data = query(options.socket_path, options.nodename)
+        if data is None:
+            reclass = make_core()
+            if options.mode == MODE_NODEINFO:
+                data = reclass.nodeinfo(options.nodename)
+            elif options.stream:
+                output_stream(reclass.inventory_stream(options.state_file), sys.stdout,
+                              options.output, options.pretty_print, options.no_refs)
+            else:
+                data = reclass.inventory(options.state_file)
+
+        if data is not None:
+            write_output(data, sys.stdout, options.output, options.pretty_print, options.no_refs)
 
     except ReclassException as e:
         e.exit_with_message(sys.stderr)
@@ -15,7 +15,7 @@ import yaml, os, optparse, posix, sys
 
 from . import errors, get_path_mangler
 from .defaults import *
-from .constants import MODE_NODEINFO, MODE_INVENTORY
+from .constants import MODE_NODEINFO, MODE_INVENTORY, MODE_SERVE
 
 
 def make_db_options_group(parser, defaults={}):
@@ -42,6 +42,18 @@ def make_db_options_group(parser, defaults={}):
     ret.add_option('-x', '--ignore-class-notfound-regexp', dest='ignore_class_notfound_regexp',
                    default=defaults.get('ignore_class_notfound_regexp', OPT_IGNORE_CLASS_NOTFOUND_REGEXP),
                    help='regexp for not found classes [%default]')
+    ret.add_option('-C', '--cache-dir', dest='cache_dir',
+                   default=defaults.get('cache_dir', OPT_CACHE_DIR),
+                   help='directory to cache parsed YAML files in [%default]')
+    ret.add_option('-P', '--preload', dest='preload', type='int',
+                   default=defaults.get('preload', OPT_PRELOAD),
+                   help='number of threads reading all YAML files at startup, 0 to read them as needed [%default]')
+    ret.add_option('-j', '--jobs', dest='jobs', type='int',
+                   default=defaults.get('jobs', OPT_JOBS),
+                   help='number of processes used to render the inventory [%default]')
+    ret.add_option('-S', '--socket', dest='socket_path',
+                   default=defaults.get('socket_path', OPT_SOCKET_PATH),
+                   help='Unix socket of a reclass server to query [%default]')
     return ret
 
 
@@ -50,7 +62,8 @@ def make_output_options_group(parser, defaults={}):
                                'Configure the way {0} prints data'.format(parser.prog))
     ret.add_option('-o', '--output', dest='output',
                    default=defaults.get('output', OPT_OUTPUT),
-                   help='output format (yaml or json) [%default]')
+                   help='output format (yaml, json, fastjson, msgpack, cbor '
+                        'or pickle) [%default]')
     ret.add_option('-y', '--pretty-print', dest='pretty_print', action="store_true",
                    default=defaults.get('pretty_print', OPT_PRETTY_PRINT),
                    help='try to make the output prettier [%default]')
@@ -67,7 +80,9 @@ def make_output_options_group(parser, defaults={}):
 
 def make_modes_options_group(parser, inventory_shortopt, inventory_longopt,
                              inventory_help, nodeinfo_shortopt,
-                             nodeinfo_longopt, nodeinfo_dest, nodeinfo_help):
+                             nodeinfo_longopt, nodeinfo_dest, nodeinfo_help,
+                             serve_longopt=None, since_longopt=None,
+                             stream_longopt=None, defaults={}):
 
     def _mode_checker_cb(option, opt_str, value, parser):
         if hasattr(parser.values, 'mode'):
@@ -76,6 +91,9 @@ def make_modes_options_group(parser, inventory_shortopt, inventory_longopt,
         if option == parser.get_option(nodeinfo_longopt):
             setattr(parser.values, 'mode', MODE_NODEINFO)
             setattr(parser.values, nodeinfo_dest, value)
+        elif serve_longopt and option == parser.get_option(serve_longopt):
+            setattr(parser.values, 'mode', MODE_SERVE)
+            setattr(parser.values, nodeinfo_dest, None)
         else:
             setattr(parser.values, 'mode', MODE_INVENTORY)
             setattr(parser.values, nodeinfo_dest, None)
@@ -89,6 +107,21 @@ def make_modes_options_group(parser, inventory_shortopt, inventory_longopt,
                    default=None, dest=nodeinfo_dest, type='string',
                    action='callback', callback=_mode_checker_cb,
                    help=nodeinfo_help)
+    if serve_longopt:
+        ret.add_option(serve_longopt,
+                       action='callback', callback=_mode_checker_cb,
+                       help='answer queries on the socket given with --socket')
+    if since_longopt:
+        ret.add_option(since_longopt, dest='state_file', default=OPT_STATE_FILE,
+                       metavar='STATE_FILE',
+                       help='with {0}, only render the nodes affected by changes '
+                            'since the run which wrote STATE_FILE'.format(inventory_longopt))
+    if stream_longopt:
+        ret.add_option(stream_longopt, dest='stream', action='store_true',
+                       default=defaults.get('stream', OPT_STREAM),
+                       help='with {0}, write every node as soon as it is '
+                            'rendered; YAML output then has the nodes before '
+                            'the classes and applications [%default]'.format(inventory_longopt))
     return ret
 
 
@@ -101,6 +134,9 @@ def make_parser_and_checker(name, version, description,
                             nodeinfo_dest='nodename',
                             nodeinfo_help='output information for a specific node',
                             add_options_cb=None,
+                            serve_longopt=None,
+                            since_longopt=None,
+                            stream_longopt=None,
                             defaults={}):
 
     parser = optparse.OptionParser(version=version)
@@ -110,6 +146,13 @@ def make_parser_and_checker(name, version, description,
     parser.usage = '%prog [options] ( {0} | {1} {2} )'.format(inventory_longopt,
                                                              nodeinfo_longopt,
                                                              nodeinfo_dest.upper())
+    modes = (MODE_NODEINFO, MODE_INVENTORY)
+    if serve_longopt:
+        parser.usage = '%prog [options] ( {0} | {1} {2} | {3} )'.format(inventory_longopt,
+                                                                   nodeinfo_longopt,
+                                                                   nodeinfo_dest.upper(),
+                                                                   serve_longopt)
+        modes += (MODE_SERVE,)
     parser.epilog = 'Exactly one mode has to be specified.'
 
     db_group = make_db_options_group(parser, defaults)
@@ -125,14 +168,16 @@ def make_parser_and_checker(name, version, description,
                                            inventory_longopt, inventory_help,
                                            nodeinfo_shortopt,
                                            nodeinfo_longopt, nodeinfo_dest,
-                                           nodeinfo_help)
+                                           nodeinfo_help, serve_longopt,
+                                           since_longopt, stream_longopt,
+                                           defaults)
     parser.add_option_group(modes_group)
 
     def option_checker(options, args):
         if len(args) > 0:
             parser.error('No arguments allowed')
         elif not hasattr(options, 'mode') \
-                or options.mode not in (MODE_NODEINFO, MODE_INVENTORY):
+                or options.mode not in modes:
             parser.error('You need to specify exactly one mode '\
                          '({0} or {1})'.format(inventory_longopt,
                                                nodeinfo_longopt))
@@ -140,6 +185,11 @@ def make_parser_and_checker(name, version, description,
                 and not getattr(options, nodeinfo_dest, None):
             parser.error('Mode {0} needs {1}'.format(nodeinfo_longopt,
                                                      nodeinfo_dest.upper()))
+        elif options.mode == MODE_SERVE and not options.socket_path:
+            parser.error('Mode {0} needs --socket'.format(serve_longopt))
+        elif getattr(options, 'state_file', None) and options.mode != MODE_INVENTORY:
+            parser.error('{0} only works with {1}'.format(since_longopt,
+                                                          inventory_longopt))
         elif options.inventory_base_uri is None and options.nodes_uri is None:
             parser.error('Must specify --inventory-base-uri or --nodes-uri')
         elif options.inventory_base_uri is None and options.classes_uri is None:
@@ -157,6 +207,9 @@ def get_options(name, version, description,
                             nodeinfo_dest='nodename',
                             nodeinfo_help='output information for a specific node',
                             add_options_cb=None,
+                            serve_longopt=None,
+                            since_longopt=None,
+                            stream_longopt=None,
                             defaults={}):
 
     parser, checker = make_parser_and_checker(name, version, description,
@@ -167,6 +220,9 @@ def get_options(name, version, description,
                                               nodeinfo_longopt, nodeinfo_dest,
                                               nodeinfo_help,
                                               add_options_cb,
+                                              serve_longopt,
+                                              since_longopt,
+                                              stream_longopt,
                                               defaults=defaults)
     options, args = parser.parse_args()
     checker(options, args)
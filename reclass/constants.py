@@ -21,3 +21,4 @@ class _Constant(object):
 
 MODE_NODEINFO = _Constant('NODEINFO')
 MODE_INVENTORY = _Constant('INVENTORY')
+MODE_SERVE = _Constant('SERVE')
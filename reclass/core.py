@@ -11,11 +11,11 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
 import copy
+import multiprocessing
 import time
 import re
-import fnmatch
-import shlex
 import os
 import sys
 import yaml
@@ -24,8 +24,66 @@ from six import iteritems
 
 from reclass.settings import Settings
 from reclass.datatypes import Entity, Classes, Parameters, Exports
-from reclass.errors import MappingFormatError, ClassNameResolveError, ClassNotFound, InvQueryClassNameResolveError, InvQueryClassNotFound, InvQueryError, InterpolationError, ResolveError
+from reclass import incremental
+from reclass.errors import ClassNameResolveError, ClassNotFound, InvQueryClassNameResolveError, InvQueryClassNotFound, InvQueryError, InterpolationError, ResolveError
 from reclass.values.parser import Parser
+from reclass.values.value import Value
+from reclass.values.valuelist import ValueList
+from reclass.utils.classmappings import ClassMappings
+from reclass.utils.parameterdict import ParameterDict
+from reclass.utils.parameterlist import ParameterList
+from reclass.utils.exportsindex import ExportsIndex
+from reclass.utils.lrucache import LRUCache
+
+
+# the __slots__ of the classes copied by _copy_slots, with their bases
+_slot_names = {}
+
+def _copy_slots(obj):
+    # copy.copy of an object with __slots__ goes through __reduce_ex__,
+    # which is several times slower
+    cls = type(obj)
+    names = _slot_names.get(cls)
+    if names is None:
+        names = _slot_names[cls] = [name for klass in cls.__mro__
+                                    for name in getattr(klass, '__slots__', ())]
+    result = object.__new__(cls)
+    for name in names:
+        setattr(result, name, getattr(obj, name))
+    return result
+
+
+class _UncacheableClassChain(Exception):
+    '''
+    Raised while filling the class merge cache when a class name contains
+    a reference, as the merge result then depends on the node parameters.
+    '''
+    pass
+
+
+# The result of merging the classes of a node in the exports pass of the
+# inventory: the uninterpolated entity, the classes visited while merging it
+# (True if merged, False if not found but ignored) and whether its parameters
+# have inventory queries.
+_MergedNode = collections.namedtuple('_MergedNode', 'entity classes has_inv_query')
+
+
+# Per process state of the workers used for parallel inventory rendering,
+# set up by _init_worker when the pool starts.
+_worker_core = None
+_worker_inventory = None
+
+def _init_worker(core, inventory):
+    global _worker_core, _worker_inventory
+    _worker_core = core
+    _worker_inventory = inventory
+
+def _worker_exports(nodename):
+    return nodename, _worker_core._node_exports(nodename, True, '', None)
+
+def _worker_nodeinfo(nodename):
+    node = _worker_core._nodeinfo(nodename, _worker_inventory)
+    return nodename, _worker_core._nodeinfo_as_dict(nodename, node)
 
 
 class Core(object):
@@ -37,6 +95,9 @@ class Core(object):
         self._class_mappings = class_mappings
         self._settings = settings
         self._input_data = input_data
+        self._class_mappings_matcher = ClassMappings(class_mappings or [])
+        self._merge_cache = LRUCache()
+        self._merge_prefixes = LRUCache()
         if self._settings.ignore_class_notfound:
             self._cnf_r = re.compile(
                 '|'.join(self._settings.ignore_class_notfound_regexp))
@@ -45,33 +106,6 @@ class Core(object):
     def _get_timestamp():
         return time.strftime('%c')
 
-    @staticmethod
-    def _match_regexp(key, nodename):
-        return re.search(key, nodename)
-
-    @staticmethod
-    def _match_glob(key, nodename):
-        return fnmatch.fnmatchcase(nodename, key)
-
-    @staticmethod
-    def _shlex_split(instr):
-        lexer = shlex.shlex(instr, posix=True)
-        lexer.whitespace_split = True
-        lexer.commenters = ''
-        regexp = False
-        if instr[0] == '/':
-            lexer.quotes += '/'
-            lexer.escapedquotes += '/'
-            regexp = True
-        try:
-            key = lexer.get_token()
-        except ValueError as e:
-            raise MappingFormatError('Error in mapping "{0}": missing closing '
-                                     'quote (or slash)'.format(instr))
-        if regexp:
-            key = '/{0}/'.format(key)
-        return key, list(lexer)
-
     def _get_class_mappings_entity(self, entity):
         if not self._class_mappings:
             return Entity(self._settings, name='empty (class mappings)')
@@ -80,20 +114,8 @@ class Core(object):
             matchname = entity.pathname
         else:
             matchname = entity.name
-        for mapping in self._class_mappings:
-            matched = False
-            key, klasses = Core._shlex_split(mapping)
-            if key[0] == ('/'):
-                matched = Core._match_regexp(key[1:-1], matchname)
-                if matched:
-                    for klass in klasses:
-                        c.append_if_new(matched.expand(klass))
-
-            else:
-                if Core._match_glob(key, matchname):
-                    for klass in klasses:
-                        c.append_if_new(klass)
-
+        for klass in self._class_mappings_matcher.get_classes(matchname):
+            c.append_if_new(klass)
         return Entity(self._settings, classes=c,
                       name='class mappings for node {0}'.format(entity.name))
 
@@ -103,7 +125,36 @@ class Core(object):
         p = Parameters(self._input_data, self._settings)
         return Entity(self._settings, parameters=p, name='input data')
 
-    def _recurse_entity(self, entity, merge_base=None, seen=None, nodename=None, environment=None):
+    def _recurse_class(self, klass, entity, merge_base, seen, nodename, environment, resolve_classes=True):
+        try:
+            class_entity = self._storage.get_class(klass, environment, self._settings)
+        except ClassNotFound as e:
+            if self._settings.ignore_class_notfound:
+                if self._cnf_r.match(klass):
+                    if self._settings.ignore_class_notfound_warning:
+                        # TODO, add logging handler
+                        print("[WARNING] Reclass class not found: '%s'. Skipped!" % klass, file=sys.stderr)
+                    # remembered as seen but not merged, so the incremental
+                    # inventory knows the name it resolved to
+                    seen[klass] = False
+                    return
+            e.nodename = nodename
+            e.uri = entity.uri
+            raise
+
+        # on every iteration, we pass what we have so far into the
+        # recursive descent …
+        descent = self._recurse_entity(class_entity, merge_base=merge_base, seen=seen,
+                                       nodename=nodename, environment=environment,
+                                       resolve_classes=resolve_classes)
+        # … therefore, we don't need to merge the result of the
+        # recursive descent as the result is a reference to the same
+        # merge_base object we passed to the call originally, with the
+        # new values merged in …
+        assert descent == merge_base
+        seen[klass] = True
+
+    def _recurse_entity(self, entity, merge_base=None, seen=None, nodename=None, environment=None, resolve_classes=True):
         if seen is None:
             seen = {}
 
@@ -118,12 +169,14 @@ class Core(object):
             num_references = klass.count(self._settings.reference_sentinels[0]) +\
                              klass.count(self._settings.export_sentinels[0])
             if num_references > 0:
-                # Make a copy of merge_base.parameters to avoid running into
-                # issues as new data is merged into merge_base.parameters.
-                # We need to make a new copy on each pass to ensure we don't
+                if not resolve_classes:
+                    raise _UncacheableClassChain(klass)
+                # Take a snapshot of merge_base.parameters to avoid running
+                # into issues as new data is merged into merge_base.parameters.
+                # We need to take a new one on each pass to ensure we don't
                 # try to resolve references using a stale set of parameters,
                 # as merge_base is updated in the loop.
-                mbparams = copy.deepcopy(merge_base.parameters)
+                mbparams = merge_base.parameters.snapshot()
                 # Enable interpolation for copy of parameters before using the
                 # copy to resolve references in class names
                 mbparams.initialise_interpolation()
@@ -133,29 +186,8 @@ class Core(object):
                     raise ClassNameResolveError(klass, nodename, entity.uri)
 
             if klass not in seen:
-                try:
-                    class_entity = self._storage.get_class(klass, environment, self._settings)
-                except ClassNotFound as e:
-                    if self._settings.ignore_class_notfound:
-                        if self._cnf_r.match(klass):
-                            if self._settings.ignore_class_notfound_warning:
-                                # TODO, add logging handler
-                                print("[WARNING] Reclass class not found: '%s'. Skipped!" % klass, file=sys.stderr)
-                            continue
-                    e.nodename = nodename
-                    e.uri = entity.uri
-                    raise
-
-                # on every iteration, we pass what we have so far into the
-                # recursive descent …
-                descent = self._recurse_entity(class_entity, merge_base=merge_base, seen=seen,
-                                               nodename=nodename, environment=environment)
-                # … therefore, we don't need to merge the result of the
-                # recursive descent as the result is a reference to the same
-                # merge_base object we passed to the call originally, with the
-                # new values merged in …
-                assert descent == merge_base
-                seen[klass] = True
+                self._recurse_class(klass, entity, merge_base, seen, nodename,
+                                    environment, resolve_classes)
 
         # … and finally, we merge what we have at this level into the
         # result of the iteration, so that elements at the current level
@@ -163,6 +195,120 @@ class Core(object):
         merge_base.merge(entity)
         return merge_base
 
+    def _snapshot_entity(self, entity):
+        '''
+        Copy an uninterpolated entity. Like merging, the copy shares the
+        parsed scalar Value objects with the original; containers, which
+        are modified when lists and dictionaries are rendered, are copied.
+        '''
+        memo = {id(self._settings): self._settings}
+
+        def copy_merged(obj):
+            # copy.deepcopy is slower than merging the classes again, so
+            # the containers built by merging are copied here directly
+            if isinstance(obj, Value):
+                if not obj.is_container():
+                    return obj
+                result = _copy_slots(obj)
+                result._item = type(obj._item)(copy_merged(obj._item.contents),
+                                               obj._item._settings)
+                return result
+            if isinstance(obj, ValueList):
+                result = _copy_slots(obj)
+                result._values = [copy_merged(v) for v in obj._values]
+                result._refs = list(obj._refs)
+                result._inv_refs = list(obj._inv_refs)
+                return result
+            if isinstance(obj, ParameterDict):
+                return ParameterDict(((k, copy_merged(v)) for k, v in iteritems(obj)),
+                                     uri=obj.uri)
+            if isinstance(obj, ParameterList):
+                return ParameterList((copy_merged(v) for v in obj), uri=obj.uri)
+            if isinstance(obj, dict):
+                return dict((k, copy_merged(v)) for k, v in iteritems(obj))
+            if isinstance(obj, list):
+                return [copy_merged(v) for v in obj]
+            return obj
+
+        for params in (entity.parameters, entity.exports):
+            memo[id(params._base)] = copy_merged(params._base)
+        return copy.deepcopy(entity, memo)
+
+    def _merge_cached_classes(self, node_entity, merge_base, seen, nodename, environment):
+        '''
+        Merge the classes at the start of the node class list into merge_base
+        using the class merge cache.
+
+        The cache maps (environment, class prefix, seen classes) to the
+        merged but uninterpolated entity of that prefix, built on an empty
+        merge base, and the classes visited while building it. Copying a
+        merged entity costs about as much as merging a few classes, so only
+        the prefixes where the class lists of the nodes branch are kept: the
+        longest prefix of the node which an earlier node also started with
+        is merged, from the longest cached prefix, and stored. Prefixes end
+        at the first class name containing a reference. The classes merged
+        here are added to seen, so the following _recurse_entity call only
+        visits the rest.
+        '''
+        classes = node_entity.classes.as_list()
+        seen_key = frozenset(seen)
+        keys = []
+        for klass in classes:
+            if (self._settings.reference_sentinels[0] in klass or
+                    self._settings.export_sentinels[0] in klass):
+                break
+            key = (environment, tuple(classes[:len(keys) + 1]), seen_key)
+            # False marks the prefixes including a class with a reference
+            if self._merge_prefixes.get(key) is False:
+                break
+            keys.append(key)
+
+        start = 0
+        cached = None
+        for i in range(len(keys), 0, -1):
+            cached = self._merge_cache.get(keys[i - 1])
+            if cached is not None:
+                start = i
+                break
+        shared = start
+        for i in range(len(keys), start, -1):
+            if self._merge_prefixes.get(keys[i - 1]):
+                shared = i
+                break
+        for key in keys:
+            self._merge_prefixes.put(key, True, self._settings.parse_cache_size)
+        if shared == 0:
+            return
+
+        def start_from(cached):
+            if cached is None:
+                return (Entity(self._settings, name='empty (@{0})'.format(nodename)),
+                        dict.fromkeys(seen, True))
+            return self._snapshot_entity(cached[0]), dict.fromkeys(seen_key | cached[1], True)
+
+        working, working_seen = start_from(cached)
+        for i in range(start, shared):
+            if classes[i] in working_seen:
+                continue
+            try:
+                self._recurse_class(classes[i], node_entity, working, working_seen,
+                                    nodename, environment, resolve_classes=False)
+            except _UncacheableClassChain:
+                self._merge_prefixes.put(keys[i], False, self._settings.parse_cache_size)
+                # throw away the partial merge of this class
+                working, working_seen = start_from(cached)
+                shared = start
+                break
+        if shared > start:
+            self._merge_cache.put(keys[shared - 1],
+                                  (self._snapshot_entity(working),
+                                   frozenset(working_seen) - seen_key),
+                                  self._settings.class_merge_cache)
+
+        if len(working_seen) > len(seen):
+            merge_base.merge(working)
+            seen.update(working_seen)
+
     def _get_automatic_parameters(self, nodename, environment):
         if self._settings.automatic_parameters:
             pars = {
@@ -180,42 +326,60 @@ class Core(object):
         else:
             return Parameters({}, self._settings, '')
 
-    def _get_inventory(self, all_envs, environment, queries):
-        inventory = {}
-        for nodename in self._storage.enumerate_nodes():
+    def _node_exports(self, nodename, all_envs, environment, queries, entities=None):
+        try:
+            node_base = self._storage.get_node(nodename, self._settings)
+            if node_base.environment is None:
+                node_base.environment = self._settings.default_environment
+        except yaml.scanner.ScannerError as e:
+            if self._settings.inventory_ignore_failed_node:
+                return None
+            raise
+
+        if not (all_envs or node_base.environment == environment):
+            return None
+        seen = {}
+        try:
+            node = self._node_entity(nodename, seen)
+        except ClassNotFound as e:
+            raise InvQueryClassNotFound(e)
+        except ClassNameResolveError as e:
+            raise InvQueryClassNameResolveError(e)
+        if entities is not None:
+            snapshot = self._snapshot_entity(node)
+        if queries is None:
             try:
-                node_base = self._storage.get_node(nodename, self._settings)
-                if node_base.environment is None:
-                    node_base.environment = self._settings.default_environment
-            except yaml.scanner.ScannerError as e:
-                if self._settings.inventory_ignore_failed_node:
-                    continue
-                raise
-
-            if all_envs or node_base.environment == environment:
+                node.interpolate_exports()
+            except InterpolationError as e:
+                e.nodename = nodename
+        else:
+            node.initialise_interpolation()
+            for p, q in queries:
                 try:
-                    node = self._node_entity(nodename)
-                except ClassNotFound as e:
-                    raise InvQueryClassNotFound(e)
-                except ClassNameResolveError as e:
-                    raise InvQueryClassNameResolveError(e)
-                if queries is None:
-                    try:
-                        node.interpolate_exports()
-                    except InterpolationError as e:
-                        e.nodename = nodename
-                else:
-                    node.initialise_interpolation()
-                    for p, q in queries:
-                        try:
-                            node.interpolate_single_export(q)
-                        except InterpolationError as e:
-                            e.nodename = nodename
-                            raise InvQueryError(q.contents, e, context=p, uri=q.uri)
-                inventory[nodename] = node.exports.as_dict()
+                    node.interpolate_single_export(q)
+                except InterpolationError as e:
+                    e.nodename = nodename
+                    raise InvQueryError(q.contents, e, context=p, uri=q.uri)
+        if entities is not None:
+            entities[nodename] = _MergedNode(snapshot, seen, node.parameters.has_inv_query)
+        return node.exports.as_dict()
+
+    def _get_inventory(self, all_envs, environment, queries, entities=None):
+        '''
+        Returns the exports of the nodes. If entities is a dict, a
+        _MergedNode is also stored in it for every node, for the nodes to be
+        rendered without merging their classes again.
+        '''
+        inventory = ExportsIndex()
+        for nodename in self._storage.enumerate_nodes():
+            exports = self._node_exports(nodename, all_envs, environment, queries, entities)
+            if exports is not None:
+                inventory[nodename] = exports
         return inventory
 
-    def _node_entity(self, nodename):
+    def _node_entity(self, nodename, seen=None):
+        if seen is None:
+            seen = {}
         node_entity = self._storage.get_node(nodename, self._settings)
         if node_entity.environment == None:
             node_entity.environment = self._settings.default_environment
@@ -223,15 +387,18 @@ class Core(object):
         base_entity.merge(self._get_class_mappings_entity(node_entity))
         base_entity.merge(self._get_input_data_entity())
         base_entity.merge_parameters(self._get_automatic_parameters(nodename, node_entity.environment))
-        seen = {}
         merge_base = self._recurse_entity(base_entity, seen=seen, nodename=nodename,
                                           environment=node_entity.environment)
+        if self._settings.class_merge_cache:
+            self._merge_cached_classes(node_entity, merge_base, seen, nodename,
+                                       node_entity.environment)
         return self._recurse_entity(node_entity, merge_base=merge_base, seen=seen,
                                     nodename=nodename, environment=node_entity.environment)
 
-    def _nodeinfo(self, nodename, inventory):
+    def _nodeinfo(self, nodename, inventory, node=None):
         try:
-            node = self._node_entity(nodename)
+            if node is None:
+                node = self._node_entity(nodename)
             node.initialise_interpolation()
             if node.parameters.has_inv_query and inventory is None:
                 inventory = self._get_inventory(node.parameters.needs_all_envs, node.environment, node.parameters.get_inv_queries())
@@ -255,32 +422,191 @@ class Core(object):
     def nodeinfo(self, nodename):
         return self._nodeinfo_as_dict(nodename, self._nodeinfo(nodename, None))
 
-    def inventory(self):
-        query_nodes = set()
+    def _map_nodes(self, func, nodenames, inventory=None):
+        pool = multiprocessing.Pool(self._settings.jobs, _init_worker,
+                                    (self, inventory))
+        try:
+            return pool.map(func, nodenames)
+        finally:
+            pool.terminate()
+
+    def _parallel_nodeinfo(self):
+        # Both passes run in a pool of worker processes: first the exports
+        # of every node are computed, then every node is rendered against
+        # the complete exports inventory. pool.map keeps the node order, so
+        # the result is the same as with the serial passes.
+        nodenames = list(self._storage.enumerate_nodes())
+        exports = self._map_nodes(_worker_exports, nodenames)
+        inventory = ExportsIndex((n, e) for (n, e) in exports if e is not None)
+        return dict(self._map_nodes(_worker_nodeinfo, nodenames, inventory))
+
+    def _node_changed(self, state, digests):
+        if state.files_changed(digests):
+            return True
+        for klass in state.missing_classes:
+            try:
+                self._storage.get_class(klass, state.environment, self._settings)
+            except ClassNotFound:
+                continue
+            return True
+        return False
+
+    def _node_state(self, node, merged, exports, nodeinfo, digests):
+        dependencies = {node.uri: digests[node.uri]}
+        missing_classes = []
+        for klass in set(merged.classes) | set(node.classes.as_list()):
+            try:
+                uri = self._storage.get_class(klass, node.environment, self._settings).uri
+            except ClassNotFound:
+                missing_classes.append(klass)
+                continue
+            dependencies[uri] = digests[uri]
+        return incremental.NodeState(dependencies, missing_classes, node.environment,
+                                     exports, merged.has_inv_query, nodeinfo)
+
+    def _incremental_nodeinfo(self, state_file):
+        '''
+        Render the nodes like the serial inventory, but take the results of
+        the previous run from state_file for the nodes which do not need to
+        be rendered again, and write the new state to state_file.
+
+        A node is rendered again when its node file or the file of one of its
+        classes changed, when one of the classes it lists but which were not
+        found now exists, and, if it has inventory queries, when the exports
+        of any node changed or nodes were added or removed. Any change to the
+        settings which affect rendering, the class mappings or the input data
+        renders all nodes.
+        '''
+        config = (incremental.settings_key(self._settings), self._class_mappings,
+                  self._input_data)
+        old_states = incremental.load_state(state_file, config)
+        states = {}
+        digests = incremental.Digests()
+        nodenames = list(self._storage.enumerate_nodes())
+
         entities = {}
-        inventory = self._get_inventory(True, '', None)
-        for n in self._storage.enumerate_nodes():
-            entities[n] = self._nodeinfo(n, inventory)
-            if entities[n].parameters.has_inv_query:
-                nodes.add(n)
-        for n in query_nodes:
-            entities[n] = self._nodeinfo(n, inventory)
+        inventory = ExportsIndex()
+        exports_changed = set(old_states) != set(nodenames)
+        for n in nodenames:
+            state = old_states.get(n)
+            if state is not None and not self._node_changed(state, digests):
+                states[n] = state
+                exports = state.exports
+            else:
+                exports = self._node_exports(n, True, '', None, entities)
+                exports_changed = exports_changed or state is None or exports != state.exports
+            if exports is not None:
+                inventory[n] = exports
 
         nodes = {}
+        for n in nodenames:
+            state = states.get(n)
+            if state is None:
+                # without a merged entity the node could not be read, and
+                # _nodeinfo raises the error
+                merged = entities.pop(n, None)
+                node = self._nodeinfo(n, inventory, merged.entity if merged else None)
+                nodes[n] = self._nodeinfo_as_dict(n, node)
+                states[n] = self._node_state(node, merged, inventory.get(n), nodes[n], digests)
+            elif exports_changed and state.has_inv_query:
+                nodes[n] = self._nodeinfo_as_dict(n, self._nodeinfo(n, inventory))
+                state.nodeinfo = nodes[n]
+            else:
+                # the node is as rendered by the previous run, but the
+                # timestamp tells when the data was produced, like for the
+                # nodes rendered again
+                state.nodeinfo['__reclass__']['timestamp'] = Core._get_timestamp()
+                nodes[n] = state.nodeinfo
+
+        incremental.save_state(state_file, config, states)
+        return nodes
+
+    def applications_nodeinfo(self, nodename):
+        '''
+        Returns the classes, applications and environment of a node. The
+        classes are merged, which resolves the references in class names,
+        but the parameters are not interpolated.
+        '''
+        node = self._node_entity(nodename)
+        return {'classes': node.classes.as_list(),
+                'applications': node.applications.as_list(),
+                'environment': node.environment
+               }
+
+    def applications_inventory(self):
+        '''
+        Returns the inventory like inventory(), but with only the classes,
+        applications and environment of every node, whose parameters are not
+        rendered.
+        '''
+        nodes = {}
+        for n in sorted(self._storage.enumerate_nodes()):
+            nodes[n] = self.applications_nodeinfo(n)
+        return self._inventory_as_dict(nodes)
+
+    def _iter_nodeinfo(self, state_file=None):
+        # Yields the nodes as (nodename, nodeinfo), sorted by name like the
+        # keys of the YAML output, so that streaming writes them in the same
+        # order. The serial passes render each node only when it is asked
+        # for, so the rendered nodes need not be kept; the parallel and
+        # incremental passes render them all first.
+        if state_file is not None or self._settings.jobs > 1:
+            if state_file is not None:
+                nodes = self._incremental_nodeinfo(state_file)
+            else:
+                nodes = self._parallel_nodeinfo()
+            for n in sorted(nodes):
+                yield n, nodes[n]
+        else:
+            entities = {}
+            inventory = self._get_inventory(True, '', None, entities)
+            for n in sorted(self._storage.enumerate_nodes()):
+                merged = entities.pop(n, None)
+                node = self._nodeinfo(n, inventory, merged.entity if merged else None)
+                yield n, self._nodeinfo_as_dict(n, node)
+
+    def inventory(self, state_file=None):
+        return self._inventory_as_dict(dict(self._iter_nodeinfo(state_file)))
+
+    def inventory_stream(self, state_file=None):
+        '''
+        Returns the inventory as a list of (key, value) pairs, in the order
+        they are to be written, for the dump_stream method of the outputters.
+
+        The value of the nodes is an iterator of (nodename, nodeinfo), which
+        renders the nodes as they are written. The classes and applications
+        are only complete once all nodes have been rendered.
+        '''
+        applications = {}
+        classes = {}
+
+        def nodes():
+            for n, d in self._iter_nodeinfo(state_file):
+                Core._add_to_index(applications, d['applications'], n)
+                Core._add_to_index(classes, d['classes'], n)
+                yield n, d
+
+        return [('__reclass__', {'timestamp': Core._get_timestamp()}),
+                ('nodes', nodes()),
+                ('classes', classes),
+                ('applications', applications)
+               ]
+
+    @staticmethod
+    def _add_to_index(index, names, nodename):
+        for name in names:
+            if name in index:
+                index[name].append(nodename)
+            else:
+                index[name] = [nodename]
+
+    @staticmethod
+    def _inventory_as_dict(nodes):
         applications = {}
         classes = {}
-        for (f, nodeinfo) in iteritems(entities):
-            d = nodes[f] = self._nodeinfo_as_dict(f, nodeinfo)
-            for a in d['applications']:
-                if a in applications:
-                    applications[a].append(f)
-                else:
-                    applications[a] = [f]
-            for c in d['classes']:
-                if c in classes:
-                    classes[c].append(f)
-                else:
-                    classes[c] = [f]
+        for (f, d) in iteritems(nodes):
+            Core._add_to_index(applications, d['applications'], f)
+            Core._add_to_index(classes, d['classes'], f)
 
         return {'__reclass__' : {'timestamp': Core._get_timestamp()},
                 'nodes': nodes,
@@ -38,10 +38,7 @@ class Applications(Classes):
         if item.startswith(self.negation_prefix):
             item = item[self._offset:]
             self._negations.append(item)
-            try:
-                self._items.remove(item)
-            except ValueError:
-                pass
+            self._items.pop(item, None)
         else:
             super(Applications, self)._append_if_new(item)
 
@@ -50,16 +47,13 @@ class Applications(Classes):
             # we might be extending ourselves to include negated applications,
             # in which case we need to remove our own content accordingly:
             for negation in iterable._negations:
-                try:
-                    self._items.remove(negation)
-                except ValueError:
-                    pass
+                self._items.pop(negation, None)
             iterable = iterable.as_list()
         for i in iterable:
             self.append_if_new(i)
 
     def __repr__(self):
-        contents = self._items + \
+        contents = self.as_list() + \
                 ['%s%s' % (self.negation_prefix, i) for i in self._negations]
         return "%s(%r, %r)" % (self.__class__.__name__, contents,
                                str(self.negation_prefix))
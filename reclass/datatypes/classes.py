@@ -13,6 +13,7 @@ from __future__ import unicode_literals
 
 import six
 import os
+from collections import OrderedDict
 from reclass.errors import InvalidClassnameError
 
 INVALID_CHARACTERS_FOR_CLASSNAMES = ' ' + os.sep
@@ -20,12 +21,15 @@ INVALID_CHARACTERS_FOR_CLASSNAMES = ' ' + os.sep
 
 class Classes(object):
     '''
-    A very limited ordered set of strings with O(n) uniqueness constraints. It
-    is neither a proper list or a proper set, on purpose, to keep things
-    simple.
+    A very limited ordered set of strings. It is neither a proper list or
+    a proper set, on purpose, to keep things simple.
+
+    The items are kept in the order they were first added, as the keys of an
+    OrderedDict, so that checking for duplicates does not get slower as
+    classes are added.
     '''
     def __init__(self, iterable=None):
-        self._items = []
+        self._items = OrderedDict()
         if iterable is not None:
             self.merge_unique(iterable)
 
@@ -34,10 +38,10 @@ class Classes(object):
 
     def __eq__(self, rhs):
         if isinstance(rhs, list):
-            return self._items == rhs
+            return self.as_list() == rhs
         else:
             try:
-                return self._items == rhs._items
+                return self.as_list() == rhs.as_list()
             except AttributeError as e:
                 return False
 
@@ -45,11 +49,14 @@ class Classes(object):
         return not self.__eq__(rhs)
 
     def as_list(self):
-        return self._items[:]
+        return list(self._items)
 
     def merge_unique(self, iterable):
-        if isinstance(iterable, self.__class__):
-            iterable = iterable.as_list()
+        if type(iterable) is self.__class__:
+            # the items of another instance have been checked already
+            for i in iterable.as_list():
+                self._append_if_new(i)
+            return
         # Cannot just call list.extend here, as iterable's items might not
         # be unique by themselves, or in the context of self.
         for i in iterable:
@@ -67,12 +74,14 @@ class Classes(object):
 
     def _append_if_new(self, item):
         if item not in self._items:
-            self._items.append(item)
+            self._items[item] = None
 
     def append_if_new(self, item):
         self._assert_is_string(item)
+        if item in self._items:
+            return
         self._assert_valid_characters(item)
-        self._append_if_new(item)
+        self._items[item] = None
 
     def __repr__(self):
-        return '%s(%r)' % (self.__class__.__name__, self._items)
+        return '%s(%r)' % (self.__class__.__name__, self.as_list())
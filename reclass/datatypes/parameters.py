@@ -20,6 +20,7 @@ from six import iteritems, next
 
 from collections import namedtuple
 from reclass.utils.dictpath import DictPath
+from reclass.utils.lrucache import LRUCache
 from reclass.utils.parameterdict import ParameterDict
 from reclass.utils.parameterlist import ParameterList
 from reclass.values.value import Value
@@ -62,6 +63,7 @@ class Parameters(object):
         self.resolve_errors = ResolveErrorList()
         self.needs_all_envs = False
         self._parse_strings = parse_strings
+        self._shared = False
         if mapping is not None:
             # initialise by merging
             self.merge(mapping)
@@ -90,6 +92,29 @@ class Parameters(object):
     def as_dict(self):
         return self._base.copy()
 
+    def snapshot(self):
+        '''
+        Returns a copy of the parameters which shares their merged data
+        instead of copying it.
+
+        initialise_interpolation() on the copy builds its own containers and
+        only copies the lists of values it merges, so it can be used to look
+        up references without changing the original. Merging into or
+        interpolating the copy first copies the shared data. The original must
+        not be changed while the copy is in use.
+        '''
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update(self.__dict__)
+        result._unrendered = None
+        result._shared = True
+        return result
+
+    def _unshare(self):
+        if self._shared:
+            self._base = copy.deepcopy(self._base)
+            self._unrendered = None
+            self._shared = False
+
     def _wrap_value(self, value):
         if isinstance(value, (Value, ValueList)):
             return value
@@ -109,7 +134,7 @@ class Parameters(object):
         try:
             return self._wrap_value(value)
         except InterpolationError as e:
-            e.context.add_ancestor(str(position))
+            e.context = e.context.new_ancestor(str(position))
             raise
 
     def _wrap_list(self, source):
@@ -230,6 +255,7 @@ class Parameters(object):
 
         """
 
+        self._unshare()
         self._unrendered = None
         if isinstance(other, dict):
             wrapped = self._wrap_dict(other)
@@ -251,6 +277,9 @@ class Parameters(object):
                     if value.needs_all_envs:
                         self.needs_all_envs = True
                 return
+            elif self._shared:
+                # merging changes the values, which are not ours to change
+                value = copy.deepcopy(value).merge()
             else:
                 value = value.merge()
         if isinstance(value, Value) and value.is_container():
@@ -286,13 +315,14 @@ class Parameters(object):
         return new_list
 
     def interpolate(self, inventory=None):
+        self._unshare()
         self._initialise_interpolate()
         while len(self._unrendered) > 0:
-            # we could use a view here, but this is simple enough:
-            # _interpolate_inner removes references from the refs hash after
-            # processing them, so we cannot just iterate the dict
-            path, v = next(iteritems(self._unrendered))
-            self._interpolate_inner(path, inventory)
+            # rendering a value can add the values with references inside it
+            # to _unrendered, so go round until none is left
+            for path in list(self._unrendered):
+                if path in self._unrendered:
+                    self._interpolate_inner(path, inventory)
         if self.resolve_errors.have_errors():
             raise self.resolve_errors
 
@@ -319,6 +349,9 @@ class Parameters(object):
             return
         self._unrendered[path] = False
         self._interpolate_references(path, value, inventory)
+        self._interpolate_render(path, value, inventory)
+
+    def _interpolate_render(self, path, value, inventory):
         new = self._interpolate_render_value(path, value, inventory)
         path.set_value(self._base, new)
         del self._unrendered[path]
@@ -344,36 +377,108 @@ class Parameters(object):
         return new
 
     def _interpolate_references(self, path, value, inventory):
-        all_refs = False
-        while not all_refs:
-            for ref in value.get_references():
-                path_from_ref = DictPath(self._settings.delimiter, ref)
-
-                if path_from_ref in self._unrendered:
-                    if self._unrendered[path_from_ref] is False:
-                        # every call to _interpolate_inner replaces the value of
-                        # self._unrendered[path] with False
-                        # Therefore, if we encounter False instead of True,
-                        # it means that we have already processed it and are now
-                        # faced with a cyclical reference.
-                        raise InfiniteRecursionError(path, ref, value.uri)
-                    else:
-                        self._interpolate_inner(path_from_ref, inventory)
-                else:
-                    # ensure ancestor keys are already dereferenced
-                    ancestor = DictPath(self._settings.delimiter)
-                    for k in path_from_ref.key_parts():
-                        ancestor = ancestor.new_subpath(k)
-                        if ancestor in self._unrendered:
-                            self._interpolate_inner(ancestor, inventory)
-            if value.allRefs:
-                all_refs = True
-            else:
-                # not all references in the value could be calculated previously so
-                # try recalculating references with current context and recursively
-                # call _interpolate_inner if the number of references has increased
-                # Otherwise raise an error
-                old = len(value.get_references())
-                value.assembleRefs(self._base)
-                if old == len(value.get_references()):
-                    raise BadReferencesError(value.get_references(), str(path), value.uri)
+        '''
+        Renders the unrendered values value refers to, and the values those
+        refer to in turn, each one after the values it depends on.
+
+        The values waiting for their references are kept on a stack instead
+        of recursing, so long chains of references do not run into the
+        recursion limit, and the stack is the chain reported when the
+        references turn out to be cyclical.
+        '''
+        stack = [_Pending(path, value)]
+        while True:
+            pending = stack[-1]
+            dependency = self._next_dependency(pending)
+            if dependency is None:
+                stack.pop()
+                if len(stack) == 0:
+                    return
+                self._interpolate_render(pending.path, pending.value, inventory)
+                continue
+            if self._unrendered[dependency] is False:
+                # every value on the stack is marked with False, so meeting
+                # one again means the references go round in a circle
+                paths = [p.path for p in stack]
+                start = paths.index(dependency) if dependency in paths else 0
+                raise InfiniteRecursionError(pending.path, pending.ref,
+                                             pending.value.uri,
+                                             paths[start:] + [dependency])
+            dependency_value = dependency.get_value(self._base)
+            if not isinstance(dependency_value, (Value, ValueList)):
+                # see _interpolate_inner
+                del self._unrendered[dependency]
+                continue
+            self._unrendered[dependency] = False
+            stack.append(_Pending(dependency, dependency_value))
+
+    def _next_dependency(self, pending):
+        '''
+        Returns the next unrendered path the pending value waits for, or None
+        if it can be rendered.
+        '''
+        while True:
+            while len(pending.refs) > 0:
+                ref = pending.refs[-1]
+                for path in _reference_paths(self._settings, ref):
+                    if path in self._unrendered:
+                        pending.ref = ref
+                        return path
+                pending.refs.pop()
+            if pending.value.allRefs:
+                return None
+            # not all references in the value could be worked out before the
+            # values they are made of were rendered, so work them out again
+            # and wait for the new ones. Otherwise raise an error
+            old = len(pending.value.get_references())
+            pending.value.assembleRefs(self._base)
+            refs = pending.value.get_references()
+            if old == len(refs):
+                raise BadReferencesError(refs, str(pending.path),
+                                         pending.value.uri)
+            pending.plan([r for r in refs if r not in pending.planned])
+
+
+class _Pending(object):
+    '''
+    A value waiting to be rendered until the values it refers to are.
+    '''
+
+    __slots__ = ('path', 'value', 'refs', 'planned', 'ref')
+
+    def __init__(self, path, value):
+        self.path = path
+        self.value = value
+        self.refs = []
+        self.planned = set()
+        self.ref = None
+        self.plan(value.get_references())
+
+    def plan(self, refs):
+        # refs are checked from the end of the list
+        self.refs.extend(reversed(refs))
+        self.planned.update(refs)
+
+
+# (delimiter, reference) → paths a reference depends on, bounded like the
+# parse cache, as long lived processes keep rendering new models
+_dependency_paths = LRUCache()
+
+def _reference_paths(settings, ref):
+    '''
+    Returns the path of the reference, followed by the paths above it from
+    the top down: a value at one of those can render into the dict holding
+    the referenced value.
+    '''
+    key = (settings.delimiter, ref)
+    paths = _dependency_paths.get(key)
+    if paths is not None:
+        return paths
+    path = DictPath(settings.delimiter, ref)
+    paths = [path]
+    ancestor = DictPath(settings.delimiter)
+    for k in path.key_parts():
+        ancestor = ancestor.new_subpath(k)
+        paths.append(ancestor)
+    _dependency_paths.put(key, paths, settings.parse_cache_size)
+    return paths
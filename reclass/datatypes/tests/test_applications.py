@@ -50,6 +50,11 @@ class TestApplications(unittest.TestCase):
         a.append_if_new(TESTLIST2[2])
         self.assertSequenceEqual(a, TESTLIST1[::2])
 
+    def test_append_if_new_after_negate(self):
+        a = Applications(TESTLIST1)
+        a.merge_unique(['~one', 'one'])
+        self.assertSequenceEqual(a, TESTLIST1[1:] + TESTLIST1[:1])
+
     def test_repr_empty(self):
         negater = '%%'
         a = Applications(negation_prefix=negater)
@@ -13,7 +13,12 @@ from reclass.utils.parameterlist import ParameterList
 from reclass.settings import Settings
 from reclass.datatypes import Exports, Parameters
 from reclass.errors import ParseError
+from reclass.values.invitem import EqualityTest
 import unittest
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
 
 SETTINGS = Settings()
 
@@ -129,5 +134,20 @@ class TestInvQuery(unittest.TestCase):
         p1.interpolate(e)
         self.assertEqual(p1.as_dict(), r)
 
+    def test_shared_inv_query(self):
+        e = {'node1': {'a': 1, 'b': 2}, 'node2': {'a': 3, 'b': 4}}
+        query = '$[ exports:a if exports:b == self:test_value ]'
+        p1 = Parameters({'exp': query, 'test_value': 2}, SETTINGS, '')
+        p2 = Parameters({'exp': query, 'test_value': 4}, SETTINGS, '')
+        # the parsed query is shared, so it must not be changed
+        with mock.patch.object(EqualityTest, '__setattr__', side_effect=AssertionError):
+            p1.interpolate(e)
+            p2.interpolate(e)
+        self.assertEqual(p1.as_dict(), {'exp': {'node1': 1}, 'test_value': 2})
+        self.assertEqual(p2.as_dict(), {'exp': {'node2': 3}, 'test_value': 4})
+        for p in (p1, p2):
+            for path, value in p.get_inv_queries():
+                self.assertEqual([str(r) for r in value.get_inv_references()], ['b', 'a'])
+
 if __name__ == '__main__':
     unittest.main()
@@ -11,8 +11,6 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import copy
-
 from six import iteritems
 
 from reclass.settings import Settings
@@ -160,6 +158,20 @@ class TestParameters(unittest.TestCase):
 
 class TestParametersNoMock(unittest.TestCase):
 
+    def test_snapshot(self):
+        p1 = Parameters({'list': [1, 2], 'ref': '${list}'}, SETTINGS, '')
+        p2 = Parameters({'list': [3], 'dict': {'a': 1}}, SETTINGS, '')
+        p1.merge(p2)
+        snapshot = p1.snapshot()
+        snapshot.initialise_interpolation()
+        self.assertEqual(snapshot.as_dict()['list'], [1, 2, 3])
+        snapshot = p1.snapshot()
+        snapshot.merge({'dict': {'b': 2}, 'list': [4]})
+        snapshot.interpolate()
+        self.assertEqual(snapshot.as_dict(), {'list': [1, 2, 3, 4], 'ref': [1, 2, 3, 4], 'dict': {'a': 1, 'b': 2}})
+        p1.interpolate()
+        self.assertEqual(p1.as_dict(), {'list': [1, 2, 3], 'ref': [1, 2, 3], 'dict': {'a': 1}})
+
     def test_merge_scalars(self):
         p = Parameters(SIMPLE, SETTINGS, '')
         mergee = {'five':5,'four':4,'None':None,'tuple':(1,2,3)}
@@ -397,8 +409,25 @@ class TestParametersNoMock(unittest.TestCase):
         with self.assertRaises(InfiniteRecursionError) as e:
             p.interpolate()
         # interpolation can start with foo or bar
-        self.assertIn(e.exception.message, [ "-> \n   Infinite recursion: ${foo}, at bar",
-                                             "-> \n   Infinite recursion: ${bar}, at foo"])
+        self.assertIn(e.exception.message, [ "-> \n   Infinite recursion: ${foo}, at bar\n      ${foo} -> ${bar} -> ${foo}",
+                                             "-> \n   Infinite recursion: ${bar}, at foo\n      ${bar} -> ${foo} -> ${bar}"])
+
+    def test_interpolate_infrecursion_cycle(self):
+        d = {'a': '${b}', 'b': {'c': '${d}'}, 'd': '${b:c}'}
+        p = Parameters(d, SETTINGS, '')
+        with self.assertRaises(InfiniteRecursionError) as e:
+            p.interpolate()
+        self.assertEqual(len(e.exception.cycle), 3)
+        self.assertEqual(e.exception.cycle[0], e.exception.cycle[-1])
+
+    def test_interpolate_long_chain(self):
+        # longer than the recursion limit
+        n = 5000
+        d = dict(('k%d' % i, '${k%d}' % (i + 1)) for i in range(n))
+        d['k%d' % n] = 'end'
+        p = Parameters(d, SETTINGS, '')
+        p.interpolate()
+        self.assertEqual(p.as_dict()['k0'], 'end')
 
     def test_nested_references(self):
         d = {'a': '${${z}}', 'b': 2, 'z': 'b'}
@@ -466,6 +495,16 @@ class TestParametersNoMock(unittest.TestCase):
         p1.interpolate()
         self.assertEqual(p1.as_dict(), r)
 
+    def test_merge_referenced_nested_dicts(self):
+        one = {'a': {'x': 1, 'l': [1]}, 'b': 2}
+        two = {'a': {'y': 2, 'l': [2]}, 'b': 3}
+        p1 = Parameters({'one': one, 'two': two, 'three': '${one}'}, SETTINGS, '')
+        p2 = Parameters({'three': '${two}'}, SETTINGS, '')
+        r = {'one': one, 'two': two, 'three': {'a': {'x': 1, 'y': 2, 'l': [1, 2]}, 'b': 3}}
+        p1.merge(p2)
+        p1.interpolate()
+        self.assertEqual(p1.as_dict(), r)
+
     def test_deep_refs_in_referenced_dicts(self):
         p = Parameters({'A': '${C:a}', 'B': {'a': 1, 'b': 2}, 'C': '${B}'}, SETTINGS, '')
         r = {'A': 1, 'B': {'a': 1, 'b': 2}, 'C': {'a': 1, 'b': 2}}
@@ -653,8 +692,7 @@ class TestParametersNoMock(unittest.TestCase):
                                                     "-> \n   Cannot resolve ${gamma}, at beta\n   Cannot resolve ${gamma}, at alpha"])
 
     def test_force_single_resolve_error(self):
-        settings = copy.deepcopy(SETTINGS)
-        settings.group_errors = False
+        settings = Settings({'group_errors': False})
         p1 = Parameters({'alpha': '${gamma}', 'beta': '${gamma}'}, settings, '')
         with self.assertRaises(ResolveError) as error:
             p1.interpolate()
@@ -663,8 +701,7 @@ class TestParametersNoMock(unittest.TestCase):
                                                  "-> \n   Cannot resolve ${gamma}, at beta"])
 
     def test_ignore_overwriten_missing_reference(self):
-        settings = copy.deepcopy(SETTINGS)
-        settings.ignore_overwritten_missing_references = True
+        settings = Settings({'ignore_overwritten_missing_references': True})
         p1 = Parameters({'alpha': '${beta}'}, settings, '')
         p2 = Parameters({'alpha': '${gamma}'}, settings, '')
         p3 = Parameters({'gamma': 3}, settings, '')
@@ -680,8 +717,7 @@ class TestParametersNoMock(unittest.TestCase):
     def test_ignore_overwriten_missing_reference_last_value(self):
         # an error should be raised if the last reference to be merged
         # is missing even if ignore_overwritten_missing_references is true
-        settings = copy.deepcopy(SETTINGS)
-        settings.ignore_overwritten_missing_references = True
+        settings = Settings({'ignore_overwritten_missing_references': True})
         p1 = Parameters({'alpha': '${gamma}'}, settings, '')
         p2 = Parameters({'alpha': '${beta}'}, settings, '')
         p3 = Parameters({'gamma': 3}, settings, '')
@@ -694,8 +730,7 @@ class TestParametersNoMock(unittest.TestCase):
     def test_ignore_overwriten_missing_reference_dict(self):
         # setting ignore_overwritten_missing_references to true should
         # not change the behaviour for dicts
-        settings = copy.deepcopy(SETTINGS)
-        settings.ignore_overwritten_missing_references = True
+        settings = Settings({'ignore_overwritten_missing_references': True})
         p1 = Parameters({'alpha': '${beta}'}, settings, '')
         p2 = Parameters({'alpha': '${gamma}'}, settings, '')
         p3 = Parameters({'gamma': {'one': 1, 'two': 2}}, settings, '')
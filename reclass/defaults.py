@@ -24,6 +24,15 @@ OPT_GROUP_ERRORS = True
 OPT_COMPOSE_NODE_NAME = False
 OPT_NO_REFS = False
 OPT_OUTPUT = 'yaml'
+OPT_JOBS = 1
+OPT_CACHE_DIR = None
+OPT_PRELOAD = 0
+OPT_SOCKET_PATH = None
+OPT_STATE_FILE = None
+OPT_STREAM = False
+OPT_PARSE_CACHE_SIZE = 10000
+OPT_REFERENCE_PARSER = 'pyparsing'
+REFERENCE_PARSERS = ('pyparsing', 'scanner')
 
 OPT_IGNORE_CLASS_NOTFOUND = False
 OPT_IGNORE_CLASS_NOTFOUND_REGEXP = ['.*']
@@ -59,3 +68,4 @@ AUTOMATIC_RECLASS_PARAMETERS = True
 DEFAULT_ENVIRONMENT = 'base'
 
 CLASS_MAPPINGS_MATCH_PATH = False
+CLASS_MERGE_CACHE = 0
@@ -17,6 +17,12 @@ import traceback
 from reclass.defaults import REFERENCE_SENTINELS, EXPORT_SENTINELS
 from reclass.utils.dictpath import DictPath
 
+def _rebuild_exception(cls, state):
+    e = cls.__new__(cls)
+    e.__dict__.update(state)
+    return e
+
+
 class ReclassException(Exception):
 
     def __init__(self, rc=posix.EX_SOFTWARE, msg=None, tbFlag=True):
@@ -32,6 +38,13 @@ class ReclassException(Exception):
     message = property(lambda self: self._get_message())
     rc = property(lambda self: self._rc)
 
+    def __reduce__(self):
+        # Exceptions are normally unpickled by calling the class with the
+        # saved args, which does not work with the constructors used here.
+        # Restore the instance state directly, so errors raised in worker
+        # processes can be passed back to the parent.
+        return (_rebuild_exception, (self.__class__, self.__dict__))
+
     def __str__(self):
         return self.message + '\n' + super(ReclassException, self).__str__()
 
@@ -261,13 +274,16 @@ class ParseError(InterpolationError):
 
 class InfiniteRecursionError(InterpolationError):
 
-    def __init__(self, context, ref, uri):
+    def __init__(self, context, ref, uri, cycle=None):
         super(InfiniteRecursionError, self).__init__(msg=None, tbFlag=False, uri=uri)
         self.context = context
         self.ref = ref
+        self.cycle = cycle
 
     def _get_error_message(self):
         msg = [ 'Infinite recursion: {0}'.format(self.ref.join(REFERENCE_SENTINELS)) + self._add_context_and_uri() ]
+        if self.cycle:
+            msg.append('   ' + ' -> '.join(str(p).join(REFERENCE_SENTINELS) for p in self.cycle))
         return msg
 
 
@@ -0,0 +1,125 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import os
+import pickle
+import tempfile
+
+# The state file written by `reclass --inventory --since STATE_FILE` is a
+# pickled dict:
+#
+#   format: _STATE_FORMAT
+#   config: the settings which affect rendering, the class mappings and the
+#           input data of the run
+#   nodes:  a dict of node name to NodeState
+#
+# bump whenever the layout of the state changes
+_STATE_FORMAT = 3
+
+_FILE_URI_PREFIX = 'yaml_fs://'
+
+# settings which change how reclass runs, but not the rendered nodes
+_RUN_SETTINGS = frozenset(['cache_dir', 'class_merge_cache', 'group_errors',
+                           'ignore_class_notfound_warning', 'jobs',
+                           'parse_cache_size', 'preload', 'reference_parser'])
+
+
+class NodeState(object):
+    '''
+    What is remembered of a node between two incremental runs.
+
+    dependencies maps the URI of the node and of each class merged into it to
+    the digest of the file contents. missing_classes are the classes the node
+    lists which were not found. exports and nodeinfo are the results of the
+    last rendering.
+    '''
+
+    def __init__(self, dependencies, missing_classes, environment, exports,
+                 has_inv_query, nodeinfo):
+        self.dependencies = dependencies
+        self.missing_classes = missing_classes
+        self.environment = environment
+        self.exports = exports
+        self.has_inv_query = has_inv_query
+        self.nodeinfo = nodeinfo
+
+    def files_changed(self, digests):
+        for uri, digest in self.dependencies.items():
+            if digest is None or digests[uri] != digest:
+                return True
+        return False
+
+
+class Digests(dict):
+    '''
+    The digests of the files, read once per run however many nodes use them.
+    '''
+
+    def __missing__(self, uri):
+        digest = uri_digest(uri)
+        self[uri] = digest
+        return digest
+
+
+def uri_digest(uri):
+    '''
+    Returns the digest of the contents of the file at uri, or None if uri is
+    not a file or cannot be read, in which case it counts as always changed.
+    '''
+    if not uri.startswith(_FILE_URI_PREFIX):
+        return None
+    try:
+        with open(uri[len(_FILE_URI_PREFIX):], 'rb') as fp:
+            return hashlib.sha1(fp.read()).hexdigest()
+    except (OSError, IOError):
+        return None
+
+
+def settings_key(settings):
+    '''
+    Returns the part of the fingerprint of settings which matters for the
+    rendered nodes, so that the state is kept when other settings change.
+    '''
+    return tuple((opt, value) for (opt, value) in settings.fingerprint
+                 if opt not in _RUN_SETTINGS)
+
+
+def load_state(path, config):
+    '''
+    Returns the node states stored in path, or an empty dict if there is no
+    usable state: no file, a file in another format or one written with a
+    different config.
+    '''
+    try:
+        with open(path, 'rb') as fp:
+            state = pickle.load(fp)
+    except Exception:
+        return {}
+    if state.get('format') != _STATE_FORMAT or state.get('config') != config:
+        return {}
+    return state['nodes']
+
+
+def save_state(path, config, nodes):
+    state = {'format': _STATE_FORMAT, 'config': config, 'nodes': nodes}
+    directory = os.path.dirname(os.path.abspath(path))
+    # write to a temporary file first, so that an interrupted run leaves the
+    # previous state in place
+    fd, tmp = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as fp:
+            pickle.dump(state, fp, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp, path)
+    except Exception:
+        os.unlink(tmp)
+        raise
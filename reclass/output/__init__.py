@@ -11,14 +11,34 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import types
+
 class OutputterBase(object):
 
+    # binary outputters return bytes from dump() and write to binary files
+    binary = False
+
     def __init__(self):
         pass
 
     def dump(self, data, pretty_print=False):
         raise NotImplementedError("dump() method not implemented.")
 
+    def dump_stream(self, items, fp, pretty_print=False, no_refs=False):
+        '''
+        Writes to fp the mapping given by items, an iterable of (key, value)
+        pairs. A value which is a generator of (key, value) pairs is written
+        as a mapping too. Outputters which can write such a mapping one pair
+        at a time override this, by default the mapping is built in memory
+        and passed to dump().
+        '''
+        data = {}
+        for key, value in items:
+            if isinstance(value, types.GeneratorType):
+                value = dict(value)
+            data[key] = value
+        fp.write(self.dump(data, pretty_print=pretty_print, no_refs=no_refs))
+
 
 class OutputLoader(object):
 
@@ -0,0 +1,106 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import struct
+import types
+
+import six
+
+from reclass.output import OutputterBase
+
+try:
+    import cbor2
+except ImportError:
+    cbor2 = None
+
+# the start and the end of a map of indefinite length
+_MAP_START = b'\xbf'
+_BREAK = b'\xff'
+
+
+def _header(major, n):
+    if n < 24:
+        return struct.pack('B', major << 5 | n)
+    for info, fmt, limit in ((24, 'B', 1 << 8), (25, 'H', 1 << 16),
+                             (26, 'I', 1 << 32), (27, 'Q', 1 << 64)):
+        if n < limit:
+            return struct.pack('>B' + fmt, major << 5 | info, n)
+    raise ValueError('{0} is too large for a CBOR header'.format(n))
+
+
+def _encode(obj, write):
+    '''
+    Writes obj in the CBOR format, as cbor2.dumps with its default options
+    does. Used when the cbor2 module is not installed.
+    '''
+    if obj is None:
+        write(b'\xf6')
+    elif obj is True:
+        write(b'\xf5')
+    elif obj is False:
+        write(b'\xf4')
+    elif isinstance(obj, six.integer_types):
+        major, n = (0, obj) if obj >= 0 else (1, -1 - obj)
+        if n < 1 << 64:
+            write(_header(major, n))
+        else:
+            # a bignum, tag 2 or 3 and the bytes of the value
+            data = bytearray()
+            while n:
+                data.insert(0, n & 0xff)
+                n >>= 8
+            write(_header(6, 2 + major))
+            _encode(bytes(data), write)
+    elif isinstance(obj, float):
+        write(struct.pack('>Bd', 0xfb, obj))
+    elif isinstance(obj, six.text_type):
+        data = obj.encode('utf-8')
+        write(_header(3, len(data)))
+        write(data)
+    elif isinstance(obj, six.binary_type):
+        write(_header(2, len(obj)))
+        write(obj)
+    elif isinstance(obj, (list, tuple)):
+        write(_header(4, len(obj)))
+        for item in obj:
+            _encode(item, write)
+    elif isinstance(obj, dict):
+        write(_header(5, len(obj)))
+        for key, value in six.iteritems(obj):
+            _encode(key, write)
+            _encode(value, write)
+    else:
+        raise TypeError('Cannot serialize {0!r}'.format(obj))
+
+
+class Outputter(OutputterBase):
+
+    binary = True
+
+    def dump(self, data, pretty_print=False, no_refs=False):
+        if cbor2 is not None:
+            return cbor2.dumps(data)
+        chunks = []
+        _encode(data, chunks.append)
+        return b''.join(chunks)
+
+    def dump_stream(self, items, fp, pretty_print=False, no_refs=False):
+        # the mappings are written with an indefinite length, as the number
+        # of pairs is only known at the end
+        fp.write(_MAP_START)
+        for key, value in items:
+            fp.write(self.dump(key))
+            if isinstance(value, types.GeneratorType):
+                self.dump_stream(value, fp)
+            else:
+                fp.write(self.dump(value))
+        fp.write(_BREAK)
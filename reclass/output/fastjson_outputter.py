@@ -0,0 +1,45 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+
+from reclass.output import OutputterBase
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class Outputter(OutputterBase):
+    '''
+    Writes JSON encoded in UTF-8 with orjson if it is installed, otherwise
+    with the json module. Unlike the json outputter, characters outside of
+    ASCII are not escaped.
+    '''
+
+    binary = True
+
+    def dump(self, data, pretty_print=False, no_refs=False):
+        if orjson is not None:
+            option = orjson.OPT_NON_STR_KEYS
+            if pretty_print:
+                option |= orjson.OPT_INDENT_2
+            try:
+                return orjson.dumps(data, option=option)
+            except orjson.JSONEncodeError:
+                # integers beyond 64 bits, which the json module handles
+                pass
+        separators = (',', ': ') if pretty_print else (',', ':')
+        indent = 2 if pretty_print else None
+        return json.dumps(data, indent=indent, separators=separators,
+                          ensure_ascii=False).encode('utf-8')
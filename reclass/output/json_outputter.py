@@ -13,6 +13,7 @@ from __future__ import unicode_literals
 
 from reclass.output import OutputterBase
 import json
+import types
 
 
 class Outputter(OutputterBase):
@@ -21,3 +22,32 @@ class Outputter(OutputterBase):
         separators = (',', ': ') if pretty_print else (',', ':')
         indent = 2 if pretty_print else None
         return json.dumps(data, indent=indent, separators=separators)
+
+    def dump_stream(self, items, fp, pretty_print=False, no_refs=False):
+        self._write_mapping(fp, items, 0, pretty_print)
+
+    def _write_mapping(self, fp, items, level, pretty_print):
+        # writes what json.dumps writes for the mapping at that level of
+        # nesting, but one value at a time
+        if pretty_print:
+            separators = (',', ': ')
+            indent = 2
+            newline = '\n' + ' ' * indent * (level + 1)
+        else:
+            separators = (',', ':')
+            indent = None
+            newline = ''
+        first = True
+        for key, value in items:
+            fp.write(('{' if first else separators[0]) + newline)
+            first = False
+            fp.write(json.dumps(key) + separators[1])
+            if isinstance(value, types.GeneratorType):
+                self._write_mapping(fp, value, level + 1, pretty_print)
+            else:
+                text = json.dumps(value, indent=indent, separators=separators)
+                fp.write(text.replace('\n', newline) if pretty_print else text)
+        if first:
+            fp.write('{}')
+        else:
+            fp.write(newline[:-indent] + '}' if pretty_print else '}')
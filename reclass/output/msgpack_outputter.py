@@ -0,0 +1,97 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import struct
+
+import six
+
+from reclass.output import OutputterBase
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _header(n, fix, fix_size, codes):
+    # the smallest of the fixed size or 8, 16 and 32 bits length headers;
+    # codes starts with None for the formats without an 8 bits length
+    if n < fix_size:
+        return struct.pack('B', fix | n)
+    for code, fmt, limit in zip(codes, ('B', 'H', 'I'), (1 << 8, 1 << 16, 1 << 32)):
+        if code is not None and n < limit:
+            return struct.pack('>B' + fmt, code, n)
+    raise ValueError('{0} items are too many for msgpack'.format(n))
+
+
+def _pack(obj, write):
+    '''
+    Writes obj in the msgpack format, as msgpack.packb with its default
+    options does. Used when the msgpack module is not installed.
+    '''
+    if obj is None:
+        write(b'\xc0')
+    elif obj is True:
+        write(b'\xc3')
+    elif obj is False:
+        write(b'\xc2')
+    elif isinstance(obj, six.integer_types):
+        if 0 <= obj < 0x80 or -0x20 <= obj < 0:
+            write(struct.pack('b' if obj < 0 else 'B', obj))
+        elif obj >= 0:
+            for code, fmt, limit in ((0xcc, 'B', 1 << 8), (0xcd, 'H', 1 << 16),
+                                     (0xce, 'I', 1 << 32), (0xcf, 'Q', 1 << 64)):
+                if obj < limit:
+                    write(struct.pack('>B' + fmt, code, obj))
+                    break
+            else:
+                raise OverflowError('Integer value out of range')
+        else:
+            for code, fmt, limit in ((0xd0, 'b', 1 << 7), (0xd1, 'h', 1 << 15),
+                                     (0xd2, 'i', 1 << 31), (0xd3, 'q', 1 << 63)):
+                if obj >= -limit:
+                    write(struct.pack('>B' + fmt, code, obj))
+                    break
+            else:
+                raise OverflowError('Integer value out of range')
+    elif isinstance(obj, float):
+        write(struct.pack('>Bd', 0xcb, obj))
+    elif isinstance(obj, six.text_type):
+        data = obj.encode('utf-8')
+        write(_header(len(data), 0xa0, 32, (0xd9, 0xda, 0xdb)))
+        write(data)
+    elif isinstance(obj, six.binary_type):
+        write(_header(len(obj), 0, 0, (0xc4, 0xc5, 0xc6)))
+        write(obj)
+    elif isinstance(obj, (list, tuple)):
+        write(_header(len(obj), 0x90, 16, (None, 0xdc, 0xdd)))
+        for item in obj:
+            _pack(item, write)
+    elif isinstance(obj, dict):
+        write(_header(len(obj), 0x80, 16, (None, 0xde, 0xdf)))
+        for key, value in six.iteritems(obj):
+            _pack(key, write)
+            _pack(value, write)
+    else:
+        raise TypeError('Cannot serialize {0!r}'.format(obj))
+
+
+class Outputter(OutputterBase):
+
+    binary = True
+
+    def dump(self, data, pretty_print=False, no_refs=False):
+        if msgpack is not None:
+            return msgpack.packb(data, use_bin_type=True)
+        chunks = []
+        _pack(data, chunks.append)
+        return b''.join(chunks)
@@ -0,0 +1,28 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pickle
+
+from reclass.output import OutputterBase
+
+
+class Outputter(OutputterBase):
+    '''
+    Writes the data with Python's pickle module, for consumers written in
+    Python. Only unpickle the output of a trusted reclass, unpickling can run
+    arbitrary code.
+    '''
+
+    binary = True
+
+    def dump(self, data, pretty_print=False, no_refs=False):
+        return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
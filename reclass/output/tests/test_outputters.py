@@ -0,0 +1,113 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import binascii
+import io
+import json
+import pickle
+
+import yaml
+
+from reclass.output import OutputLoader
+from reclass.output import cbor_outputter, msgpack_outputter
+
+import unittest
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+SHARED = ['a', 'b']
+DATA = {'__reclass__': {'timestamp': 'now'},
+        'nodes': {'web1': {'parameters': {'motd': 'line 1\nline 2', 'empty': {},
+                                          'x': SHARED, 'y': SHARED}},
+                  'web2': {'parameters': {'long': 'word ' * 40}}},
+        'classes': {'web': ['web1', 'web2']},
+        'empty': {}}
+
+class TestOutputters(unittest.TestCase):
+
+    def _dump_stream(self, fmt, streamed, **kwargs):
+        items = []
+        for key, value in DATA.items():
+            if key in streamed:
+                value = (item for item in value.items())
+            items.append((key, value))
+        fp = io.StringIO()
+        OutputLoader(fmt).load()().dump_stream(items, fp, **kwargs)
+        return fp.getvalue()
+
+    def test_json_dump_stream(self):
+        outputter = OutputLoader('json').load()()
+        for pretty_print in (False, True):
+            for streamed in ((), ('nodes',), ('nodes', 'empty')):
+                self.assertEqual(self._dump_stream('json', streamed, pretty_print=pretty_print),
+                                 outputter.dump(DATA, pretty_print=pretty_print))
+
+    def test_yaml_dump_stream(self):
+        for pretty_print in (False, True):
+            for no_refs in (False, True):
+                for streamed in ((), ('nodes',), ('nodes', 'empty')):
+                    text = self._dump_stream('yaml', streamed, pretty_print=pretty_print,
+                                             no_refs=no_refs)
+                    self.assertEqual(yaml.safe_load(text), DATA)
+
+    def _dump(self, fmt, data, **kwargs):
+        return OutputLoader(fmt).load()().dump(data, **kwargs)
+
+    def test_pickle(self):
+        self.assertEqual(pickle.loads(self._dump('pickle', DATA)), DATA)
+
+    def test_fastjson(self):
+        for pretty_print in (False, True):
+            text = self._dump('fastjson', DATA, pretty_print=pretty_print)
+            self.assertEqual(json.loads(text.decode('utf-8')), DATA)
+        self.assertEqual(self._dump('fastjson', {1: 'ü', 'big': 1 << 70}),
+                         '{{"1":"ü","big":{0}}}'.format(1 << 70).encode('utf-8'))
+
+    def _check_encoding(self, module, name, examples):
+        with mock.patch.object(module, name, None):
+            for data, expected in examples:
+                self.assertEqual(binascii.hexlify(module.Outputter().dump(data)),
+                                 expected.encode('ascii'))
+
+    def test_msgpack_fallback(self):
+        self._check_encoding(msgpack_outputter, 'msgpack', [
+            (None, 'c0'), (True, 'c3'), (False, 'c2'),
+            (1, '01'), (127, '7f'), (128, 'cc80'), (256, 'cd0100'),
+            (1 << 16, 'ce00010000'), (1 << 32, 'cf0000000100000000'),
+            (-1, 'ff'), (-32, 'e0'), (-33, 'd0df'), (-129, 'd1ff7f'),
+            (1.5, 'cb3ff8000000000000'), ('a', 'a161'), ('ü', 'a2c3bc'),
+            ('x' * 32, 'd920' + '78' * 32), ([], '90'), ({}, '80'),
+            ({'a': [1]}, '81a1619101'), (list(range(16)), 'dc0010' + ''.join(
+                '{0:02x}'.format(i) for i in range(16)))])
+
+    def test_cbor_fallback(self):
+        # the examples of RFC 8949, appendix A
+        self._check_encoding(cbor_outputter, 'cbor2', [
+            (0, '00'), (23, '17'), (24, '1818'), (100, '1864'), (1000, '1903e8'),
+            (1000000, '1a000f4240'), (1000000000000, '1b000000e8d4a51000'),
+            (18446744073709551616, 'c249010000000000000000'),
+            (-18446744073709551617, 'c349010000000000000000'),
+            (-1, '20'), (-100, '3863'), (-1000, '3903e7'),
+            (1.1, 'fb3ff199999999999a'), (False, 'f4'), (True, 'f5'), (None, 'f6'),
+            ('', '60'), ('a', '6161'), ('ü', '62c3bc'), ([], '80'),
+            ([1, 2, 3], '83010203'), ({}, 'a0'), ({'a': 1, 'b': [2, 3]}, 'a26161016162820203')])
+
+    def test_cbor_dump_stream(self):
+        with mock.patch.object(cbor_outputter, 'cbor2', None):
+            fp = io.BytesIO()
+            cbor_outputter.Outputter().dump_stream(
+                [('a', 1), ('b', (item for item in [('c', [2])]))], fp)
+            self.assertEqual(binascii.hexlify(fp.getvalue()), b'bf6161016162bf61638102ffff')
+
+
+if __name__ == '__main__':
+    unittest.main()
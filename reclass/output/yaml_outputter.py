@@ -12,6 +12,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from reclass.output import OutputterBase
+import types
 import yaml
 
 _SafeDumper = yaml.CSafeDumper if yaml.__with_libyaml__ else yaml.SafeDumper
@@ -25,6 +26,53 @@ class Outputter(OutputterBase):
         else:
             return yaml.dump(data, default_flow_style=not pretty_print, Dumper=_SafeDumper)
 
+    def dump_stream(self, items, fp, pretty_print=False, no_refs=False):
+        # Every pair is dumped on its own, as a mapping of one key: in block
+        # style that is a line of the enclosing mapping already, in flow style
+        # the braces are removed and the pairs joined with commas. Aliases
+        # only refer to anchors within the same pair.
+        dumper = ExplicitDumper if no_refs else _SafeDumper
+
+        def dump_pair(key, value):
+            if pretty_print:
+                return yaml.dump({key: value}, default_flow_style=False, Dumper=dumper)
+            # the pair is kept on one line, so that the braces are the
+            # first and last characters
+            text = yaml.dump({key: value}, default_flow_style=True,
+                             width=2 ** 30, Dumper=dumper)
+            return text.rstrip('\n')[1:-1]
+
+        def write_mapping(items, indent):
+            first = True
+            for key, value in items:
+                if isinstance(value, types.GeneratorType):
+                    text = dump_pair(key, {})
+                    # the empty mapping is replaced with the pairs of value
+                    text = text[:text.rindex('{}')]
+                    if pretty_print:
+                        fp.write(indent + text.rstrip() + '\n')
+                        write_mapping(value, indent + '  ')
+                    else:
+                        fp.write(('' if first else ', ') + text + '{')
+                        write_mapping(value, indent)
+                        fp.write('}')
+                elif pretty_print:
+                    fp.write(''.join(indent + line for line in
+                                     dump_pair(key, value).splitlines(True)))
+                else:
+                    fp.write(('' if first else ', ') + dump_pair(key, value))
+                first = False
+            if first and pretty_print:
+                # an empty generator, the key written before it needs a value
+                fp.write(indent + '{}\n')
+
+        if pretty_print:
+            write_mapping(items, '')
+        else:
+            fp.write('{')
+            write_mapping(items, '')
+            fp.write('}\n')
+
 
 class ExplicitDumper(_SafeDumper):
     """
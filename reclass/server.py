@@ -0,0 +1,182 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import errno
+import json
+import os
+import pickle
+import posix
+import signal
+import socket
+import stat
+import struct
+import sys
+
+from six.moves import socketserver
+
+from reclass.errors import InvocationError, PermissionError, ReclassException
+
+# only available on Linux
+_SO_PEERCRED = getattr(socket, 'SO_PEERCRED', None)
+
+# Requests are a single line of JSON, {"nodename": NAME} for the information
+# of one node or {"nodename": null} for the whole inventory. The reply is a
+# pickled tuple, either (True, data) or (False, exception). As the client
+# unpickles the reply, it only talks to a server run by the same user.
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            # a client checking if the server is running
+            return
+        try:
+            try:
+                request = json.loads(line.decode('utf-8'))
+            except ValueError:
+                request = None
+            if not isinstance(request, dict):
+                raise InvocationError('Invalid request: {0!r}'.format(line))
+            core = self.server.get_core()
+            nodename = request.get('nodename')
+            if nodename is None:
+                reply = (True, core.inventory())
+            else:
+                reply = (True, core.nodeinfo(nodename))
+        except ReclassException as e:
+            reply = (False, e)
+        except Exception as e:
+            # any other error, from a broken file for instance, is passed on
+            # too, but as not every exception can be pickled, by its message
+            msg = '{0}: {1}'.format(e.__class__.__name__, e)
+            reply = (False, ReclassException(msg=msg))
+        pickle.dump(reply, self.wfile, pickle.HIGHEST_PROTOCOL)
+
+
+class ReclassServer(socketserver.UnixStreamServer):
+    '''
+    Answer nodeinfo and inventory requests on a Unix socket, using a Core
+    object that is kept between requests, so the storage caches stay warm.
+
+    make_core is called to create the Core object, and again on the next
+    request after reload() has been called.
+    '''
+
+    def __init__(self, socket_path, make_core):
+        self._make_core = make_core
+        self._core = None
+        # only the user running the server may connect
+        umask = os.umask(0o177)
+        try:
+            socketserver.UnixStreamServer.__init__(self, socket_path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def get_core(self):
+        if self._core is None:
+            self._core = self._make_core()
+        return self._core
+
+    def reload(self):
+        self._core = None
+
+
+def _check_owner(socket_path, sock):
+    # the socket has to be the one made by a server run by the same user: on
+    # Linux the credentials of the server are checked, elsewhere the owner and
+    # the mode of the socket file
+    uid = os.getuid()
+    if _SO_PEERCRED is not None:
+        creds = sock.getsockopt(socket.SOL_SOCKET, _SO_PEERCRED,
+                                struct.calcsize(str('3i')))
+        pid, server_uid, gid = struct.unpack(str('3i'), creds)
+        trusted = server_uid == uid
+    else:
+        st = os.stat(socket_path)
+        trusted = st.st_uid == uid and not st.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+    if not trusted:
+        raise PermissionError('The server on {0} is not run by the current '
+                              'user'.format(socket_path))
+
+
+def _connect(socket_path):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except socket.error as e:
+        sock.close()
+        if e.errno in (errno.ENOENT, errno.ECONNREFUSED):
+            return None
+        raise
+    try:
+        _check_owner(socket_path, sock)
+    except Exception:
+        sock.close()
+        raise
+    return sock
+
+
+def _listening(socket_path):
+    sock = _connect(socket_path)
+    if sock is None:
+        return False
+    sock.close()
+    return True
+
+
+def serve(socket_path, make_core):
+    '''
+    Serve requests on socket_path until interrupted or terminated. The model
+    is read again on SIGHUP.
+    '''
+    if os.path.exists(socket_path):
+        if _listening(socket_path):
+            raise InvocationError('A server is already listening on {0}'.format(socket_path))
+        # left behind by a server that is no longer running
+        os.unlink(socket_path)
+    server = ReclassServer(socket_path, make_core)
+    signal.signal(signal.SIGHUP, lambda signum, frame: server.reload())
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(posix.EX_OK))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(socket_path)
+
+
+def query(socket_path, nodename=None):
+    '''
+    Ask the server on socket_path for the information of nodename, or for the
+    whole inventory if nodename is None. Errors raised by the server are raised
+    again here. Returns None if no server is listening on socket_path, raises
+    PermissionError if the server is not run by the current user.
+    '''
+    sock = _connect(socket_path)
+    if sock is None:
+        return None
+    try:
+        request = json.dumps({'nodename': nodename}) + '\n'
+        sock.sendall(request.encode('utf-8'))
+        with sock.makefile('rb') as fp:
+            try:
+                ok, data = pickle.load(fp)
+            except EOFError:
+                raise InvocationError('The server on {0} closed the connection '
+                                      'without replying'.format(socket_path))
+    finally:
+        sock.close()
+    if not ok:
+        raise data
+    return data
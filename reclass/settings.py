@@ -6,6 +6,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import reclass.defaults as defaults
+from reclass.errors import ConfigError
 
 from six import string_types, iteritems
 
@@ -19,7 +20,9 @@ class Settings(object):
         'allow_dict_over_scalar': defaults.OPT_ALLOW_DICT_OVER_SCALAR,
         'allow_none_override': defaults.OPT_ALLOW_NONE_OVERRIDE,
         'automatic_parameters': defaults.AUTOMATIC_RECLASS_PARAMETERS,
+        'cache_dir': defaults.OPT_CACHE_DIR,
         'class_mappings_match_path': defaults.CLASS_MAPPINGS_MATCH_PATH,
+        'class_merge_cache': defaults.CLASS_MERGE_CACHE,
         'default_environment': defaults.DEFAULT_ENVIRONMENT,
         'delimiter': defaults.PARAMETER_INTERPOLATION_DELIMITER,
         'dict_key_override_prefix':
@@ -32,6 +35,10 @@ class Settings(object):
             defaults.OPT_INVENTORY_IGNORE_FAILED_NODE,
         'inventory_ignore_failed_render':
             defaults.OPT_INVENTORY_IGNORE_FAILED_RENDER,
+        'jobs': defaults.OPT_JOBS,
+        'parse_cache_size': defaults.OPT_PARSE_CACHE_SIZE,
+        'preload': defaults.OPT_PRELOAD,
+        'reference_parser': defaults.OPT_REFERENCE_PARSER,
         'reference_sentinels': defaults.REFERENCE_SENTINELS,
         'ignore_class_notfound': defaults.OPT_IGNORE_CLASS_NOTFOUND,
         'strict_constant_parameters':
@@ -48,25 +55,62 @@ class Settings(object):
 
     def __init__(self, options={}):
         for opt_name, opt_value in iteritems(self.known_opts):
-            setattr(self, opt_name, options.get(opt_name, opt_value))
+            self._set(opt_name, options.get(opt_name, opt_value))
 
-        self.dict_key_prefixes = [str(self.dict_key_override_prefix),
-                                  str(self.dict_key_constant_prefix)]
+        if self.reference_parser not in defaults.REFERENCE_PARSERS:
+            raise ConfigError('Unknown reference_parser {0!r}, use one of: {1}'.format(
+                self.reference_parser, ', '.join(defaults.REFERENCE_PARSERS)))
+        self._set('dict_key_prefixes', (str(self.dict_key_override_prefix),
+                                        str(self.dict_key_constant_prefix)))
         if isinstance(self.ignore_class_notfound_regexp, string_types):
-            self.ignore_class_notfound_regexp = [
-                    self.ignore_class_notfound_regexp]
+            self._set('ignore_class_notfound_regexp',
+                      (self.ignore_class_notfound_regexp,))
+        self._set('_fingerprint',
+                  tuple((opt, _freeze(getattr(self, opt)))
+                        for opt in sorted(self.known_opts)))
+
+    def _set(self, name, value):
+        # lists are kept as tuples, so they cannot be changed in place either
+        if isinstance(value, list):
+            value = tuple(value)
+        object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        # settings are shared by everything created with them and grammars
+        # and caches are keyed on their values, so they must not change
+        raise AttributeError('{0} objects are immutable'.format(
+            self.__class__.__name__))
+
+    @property
+    def fingerprint(self):
+        '''
+        A hashable value which is equal for equal settings.
+        '''
+        return self._fingerprint
 
     def __eq__(self, other):
+        if self is other:
+            return True
         if isinstance(other, type(self)):
-            return all(getattr(self, opt) == getattr(other, opt)
-                       for opt in self.known_opts)
+            return self._fingerprint == other._fingerprint
         return False
 
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self._fingerprint)
+
     def __copy__(self):
-        cls = self.__class__
-        result = cls.__new__(cls)
-        result.__dict__.update(self.__dict__)
-        return result
+        return self
 
     def __deepcopy__(self, memo):
-        return self.__copy__()
+        return self
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in iteritems(value)))
+    return value
@@ -32,6 +32,13 @@ class NodeStorageBase(object):
         msg = "Storage class '{0}' does not implement node enumeration."
         raise NotImplementedError(msg.format(self.name))
 
+    def stamp(self):
+        '''
+        Returns a value which changes when the nodes or classes in the storage
+        change, or None if the storage cannot tell.
+        '''
+        return None
+
     def path_mangler(self):
         msg = "Storage class '{0}' does not implement path_mangler."
         raise NotImplementedError(msg.format(self.name))
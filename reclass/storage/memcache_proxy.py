@@ -64,3 +64,6 @@ class MemcacheProxy(NodeStorageBase):
             self._nodelist_cache = self._real_storage.enumerate_nodes()
 
         return self._nodelist_cache
+
+    def stamp(self):
+        return self._real_storage.stamp()
@@ -10,7 +10,14 @@ from __future__ import unicode_literals
 
 from reclass.storage.yamldata import YamlData
 
+import os
+import shutil
+import tempfile
 import unittest
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
 
 class TestYamlData(unittest.TestCase):
 
@@ -37,5 +44,60 @@ class TestYamlData(unittest.TestCase):
         self.assertEqual(res.uri, 'testpath')
         self.assertEqual(res.get_data(), self.yamldict)
 
+    def test_yaml_from_file_cached(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'node.yml')
+        cache_dir = os.path.join(tmpdir, 'cache')
+        with open(path, 'w') as fp:
+            fp.write(self.data)
+        res = YamlData.from_file(path, cache_dir)
+        self.assertEqual(res.uri, 'yaml_fs://{0}'.format(path))
+        self.assertEqual(res.get_data(), self.yamldict)
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        with mock.patch('reclass.storage.yamldata._load_file') as load:
+            res = YamlData.from_file(path, cache_dir)
+            self.assertFalse(load.called)
+        self.assertEqual(res.get_data(), self.yamldict)
+
+        with open(path, 'a') as fp:
+            fp.write('\n    gamma: 3')
+        res = YamlData.from_file(path, cache_dir)
+        self.assertEqual(res.get_data()['parameters']['_TEST_']['gamma'], 3)
+
+    def test_yaml_from_file_cache_untrusted(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'node.yml')
+        cache_dir = os.path.join(tmpdir, 'cache')
+        with open(path, 'w') as fp:
+            fp.write(self.data)
+        YamlData.from_file(path, cache_dir)
+        self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+
+        # entries of another user, or in a directory others can write to,
+        # are not unpickled
+        load = 'reclass.storage.yamldata._load_file'
+        with mock.patch(load, return_value=self.yamldict) as load_file:
+            with mock.patch('os.getuid', return_value=os.getuid() + 1):
+                res = YamlData.from_file(path, cache_dir)
+            self.assertTrue(load_file.called)
+        self.assertEqual(res.get_data(), self.yamldict)
+        os.chmod(cache_dir, 0o770)
+        with mock.patch(load, return_value=self.yamldict) as load_file:
+            YamlData.from_file(path, cache_dir)
+            self.assertTrue(load_file.called)
+        os.chmod(cache_dir, 0o700)
+        entry = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+        os.chmod(entry, 0o666)
+        with mock.patch(load, return_value=self.yamldict) as load_file:
+            YamlData.from_file(path, cache_dir)
+            self.assertTrue(load_file.called)
+        # the entry written again is used
+        with mock.patch(load, return_value=self.yamldict) as load_file:
+            YamlData.from_file(path, cache_dir)
+            self.assertFalse(load_file.called)
+
 if __name__ == '__main__':
     unittest.main()
@@ -131,4 +131,4 @@ class ExternalNodeStorage(ExternalNodeStorageBase):
         return entity
 
     def enumerate_nodes(self):
-        return self._nodes.keys()
+        return list(self._nodes.keys())
@@ -11,6 +11,7 @@ from __future__ import (absolute_import, division, print_function,
 
 import os
 import sys
+from multiprocessing.pool import ThreadPool
 
 import yaml
 
@@ -29,6 +30,14 @@ def vvv(msg):
     #print(msg, file=sys.stderr)
     pass
 
+def _preload_file(args):
+    path, cache_dir = args
+    try:
+        return path, YamlData.from_file(path, cache_dir)
+    except Exception:
+        # read again when needed, to raise the error then
+        return path, None
+
 def path_mangler(inventory_base_uri, nodes_uri, classes_uri):
 
     if inventory_base_uri is None:
@@ -57,6 +66,7 @@ class ExternalNodeStorage(ExternalNodeStorageBase):
 
     def __init__(self, nodes_uri, classes_uri, compose_node_name):
         super(ExternalNodeStorage, self).__init__(STORAGE_NAME, compose_node_name)
+        self._preloaded = None
 
         if nodes_uri is not None:
             self._nodes_uri = nodes_uri
@@ -92,6 +102,62 @@ class ExternalNodeStorage(ExternalNodeStorageBase):
         d.walk(register_fn)
         return ret
 
+    def stamp(self):
+        '''
+        Returns the path, inode, size and modification time of every
+        directory and YAML file of the inventory, which change when a file
+        is added, removed, replaced or written to.
+        '''
+        stats = []
+        def register_fn(dirpath, filenames):
+            paths = [os.path.join(dirpath, f) for f in filenames
+                     if f.endswith(FILE_EXTENSION)]
+            for path in [dirpath] + paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    # removed while walking the directory
+                    st = None
+                else:
+                    st = (st.st_ino, st.st_size, st.st_mtime)
+                stats.append((path, st))
+
+        for uri in (getattr(self, '_nodes_uri', None), getattr(self, '_classes_uri', None)):
+            if uri is not None:
+                Directory(uri).walk(register_fn)
+        return tuple(stats)
+
+    def _preload(self, settings):
+        '''
+        Reads and parses all node and class files in a pool of
+        settings.preload threads, the first time a file is needed.
+        '''
+        self._preloaded = {}
+        paths = []
+        if hasattr(self, '_nodes'):
+            paths.extend(os.path.join(self.nodes_uri, f) for f in self._nodes.values())
+        if hasattr(self, '_classes'):
+            paths.extend(os.path.join(self.classes_uri, f) for f in self._classes.values())
+        pool = ThreadPool(settings.preload)
+        try:
+            for path, data in pool.imap_unordered(
+                    _preload_file, [(p, settings.cache_dir) for p in paths]):
+                if data is not None:
+                    self._preloaded[path] = data
+        finally:
+            pool.close()
+            pool.join()
+
+    def _load(self, path, settings):
+        if settings.preload > 0:
+            if self._preloaded is None:
+                self._preload(settings)
+            # the preloaded data is only used once, like a freshly read file
+            data = self._preloaded.pop(path, None)
+            if data is not None:
+                return data
+        return YamlData.from_file(path, settings.cache_dir)
+
     def get_node(self, name, settings):
         vvv('GET NODE {0}'.format(name))
         try:
@@ -100,7 +166,7 @@ class ExternalNodeStorage(ExternalNodeStorageBase):
             pathname = os.path.splitext(relpath)[0]
         except KeyError as e:
             raise reclass.errors.NodeNotFound(self.name, name, self.nodes_uri)
-        entity = YamlData.from_file(path).get_entity(name, pathname, settings)
+        entity = self._load(path, settings).get_entity(name, pathname, settings)
         return entity
 
     def get_class(self, name, environment, settings):
@@ -110,8 +176,8 @@ class ExternalNodeStorage(ExternalNodeStorageBase):
             pathname = os.path.splitext(self._classes[name])[0]
         except KeyError as e:
             raise reclass.errors.ClassNotFound(self.name, name, self.classes_uri)
-        entity = YamlData.from_file(path).get_entity(name, pathname, settings)
+        entity = self._load(path, settings).get_entity(name, pathname, settings)
         return entity
 
     def enumerate_nodes(self):
-        return self._nodes.keys()
+        return list(self._nodes.keys())
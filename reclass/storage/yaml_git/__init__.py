@@ -296,7 +296,7 @@ class ExternalNodeStorage(ExternalNodeStorageBase):
         return entity
 
     def enumerate_nodes(self):
-        return self._nodes.keys()
+        return list(self._nodes.keys())
 
     def _load_repo(self, uri):
         if uri.repo not in self._repos:
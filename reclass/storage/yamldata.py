@@ -14,25 +14,97 @@ from __future__ import unicode_literals
 from reclass import datatypes
 import yaml
 import os
+import hashlib
+import pickle
+import stat
+import tempfile
 from reclass.errors import NotFoundError
 
 _SafeLoader = yaml.CSafeLoader if yaml.__with_libyaml__ else yaml.SafeLoader
 
+# bump whenever the layout of the cache entries changes
+_PARSE_CACHE_FORMAT = 1
+
+def _load_file(path):
+    with open(path) as fp:
+        return yaml.load(fp, Loader=_SafeLoader)
+
+def _trusted(st):
+    # the entries are unpickled, which can run arbitrary code, so they and
+    # the cache directory must not be writable by anyone else
+    return (st.st_uid == os.getuid() and
+            not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH))
+
+def _load_file_cached(path, cache_dir):
+    '''
+    Load a YAML file through the parse cache in cache_dir.
+
+    Every file gets a cache entry named after the hash of its path, which
+    holds the parsed data pickled together with the path, mtime, size and
+    inode of the file it was parsed from. The entry is used as long as the
+    file stat still matches, otherwise the file is parsed again and the
+    entry rewritten. Problems reading or writing the cache are not errors,
+    the file is just parsed as if there was no cache. The cache is not
+    used unless cache_dir and the entry are owned by the current user and
+    not writable by others.
+    '''
+    st = os.stat(path)
+    mtime = getattr(st, 'st_mtime_ns', st.st_mtime)
+    key = (_PARSE_CACHE_FORMAT, path, mtime, st.st_size, st.st_ino)
+    entry = os.path.join(cache_dir, hashlib.sha1(path.encode('utf-8')).hexdigest())
+    try:
+        if not _trusted(os.stat(cache_dir)):
+            return _load_file(path)
+    except OSError:
+        # created below
+        pass
+    try:
+        with open(entry, 'rb') as fp:
+            if _trusted(os.fstat(fp.fileno())):
+                cached_key, data = pickle.load(fp)
+                if cached_key == key:
+                    return data
+    except Exception:
+        pass
+
+    data = _load_file(path)
+    try:
+        if not os.path.isdir(cache_dir):
+            os.makedirs(cache_dir, 0o700)
+        # write to a temporary file first, so that concurrent readers never
+        # see a partial entry
+        fd, tmp = tempfile.mkstemp(dir=cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as fp:
+                pickle.dump((key, data), fp, pickle.HIGHEST_PROTOCOL)
+            os.rename(tmp, entry)
+        except Exception:
+            os.unlink(tmp)
+            raise
+    except (OSError, IOError, pickle.PicklingError):
+        pass
+    return data
+
 class YamlData(object):
 
     @classmethod
-    def from_file(cls, path):
-        ''' Initialise yaml data from a local file '''
+    def from_file(cls, path, cache_dir=None):
+        '''
+        Initialise yaml data from a local file, using the parse cache in
+        cache_dir if given
+        '''
         abs_path = os.path.abspath(path)
         if not os.path.isfile(abs_path):
             raise NotFoundError('No such file: %s' % abs_path)
         if not os.access(abs_path, os.R_OK):
             raise NotFoundError('Cannot open: %s' % abs_path)
         y = cls('yaml_fs://{0}'.format(abs_path))
-        with open(abs_path) as fp:
-            data = yaml.load(fp, Loader=_SafeLoader)
-            if data is not None:
-                y._data = data
+        if cache_dir is None:
+            data = _load_file(abs_path)
+        else:
+            data = _load_file_cached(abs_path, cache_dir)
+        if data is not None:
+            y._data = data
         return y
 
     @classmethod
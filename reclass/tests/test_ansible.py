@@ -0,0 +1,48 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+
+from reclass import get_storage, get_path_mangler
+from reclass.adapters.ansible import host_vars, inventory_groups
+from reclass.core import Core
+from reclass.settings import Settings
+
+import unittest
+
+class TestAnsible(unittest.TestCase):
+
+    def setUp(self):
+        inventory_uri = os.path.dirname(os.path.abspath(__file__)) + '/data/07'
+        path_mangler = get_path_mangler('yaml_fs')
+        nodes_uri, classes_uri = path_mangler(inventory_uri, 'nodes', 'classes')
+        storage = get_storage('yaml_fs', nodes_uri, classes_uri, False)
+        self.reclass = Core(storage, None, Settings())
+
+    def test_host_vars(self):
+        data = host_vars(self.reclass.nodeinfo('web1'))
+        self.assertEqual(data['fqdn'], 'web1.example.org')
+        self.assertEqual(data['__reclass__']['applications'], ['common', 'web'])
+
+    def test_inventory_groups(self):
+        groups = inventory_groups(self.reclass.inventory(), '_hosts')
+        self.assertEqual(sorted(groups['web_hosts']), ['web1', 'web2'])
+        self.assertEqual(sorted(groups['db']), ['db1', 'db2'])
+        hostvars = groups['_meta']['hostvars']
+        self.assertEqual(sorted(hostvars), ['db1', 'db2', 'web1', 'web2'])
+        for hostname, data in hostvars.items():
+            expected = host_vars(self.reclass.nodeinfo(hostname))
+            del data['__reclass__']['timestamp']
+            del expected['__reclass__']['timestamp']
+            self.assertEqual(data, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
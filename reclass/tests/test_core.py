@@ -8,12 +8,16 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import multiprocessing
 import os
+import shutil
+import tempfile
 
 from reclass import get_storage, get_path_mangler
 from reclass.core import Core
 from reclass.settings import Settings
-from reclass.errors import ClassNotFound
+from reclass.storage.yamldata import YamlData
+from reclass.errors import ClassNotFound, InvQueryClassNotFound
 
 import unittest
 try:
@@ -31,6 +35,13 @@ class TestCore(unittest.TestCase):
         storage = get_storage('yaml_fs', nodes_uri, classes_uri, settings.compose_node_name)
         return Core(storage, class_mappings, settings)
 
+    def _inventory(self, reclass):
+        inventory = reclass.inventory()
+        del inventory['__reclass__']
+        for node in inventory['nodes'].values():
+            del node['__reclass__']['timestamp']
+        return inventory
+
     def test_type_conversion(self):
         reclass = self._core('01')
         node = reclass.nodeinfo('data_types')
@@ -123,5 +134,158 @@ class TestCore(unittest.TestCase):
         self.assertEqual(A_node['applications'], A_node['parameters']['expected_apps'])
         self.assertEqual(B_node['applications'], B_node['parameters']['expected_apps'])
 
+    def test_inventory(self):
+        inventory = self._inventory(self._core('07'))
+        web1 = inventory['nodes']['web1']['parameters']
+        self.assertEqual(web1['db_hosts'], {'db1': 'db1.example.org', 'db2': 'db2.example.org'})
+        self.assertEqual(sorted(web1['all_nodes']), ['db1', 'db2', 'web1', 'web2'])
+        self.assertEqual(sorted(inventory['applications']['web']), ['web1', 'web2'])
+
+    def test_applications_inventory(self):
+        # 05 has references in class names
+        for dataset in ('05', '06', '07'):
+            reclass = self._core(dataset)
+            inventory = self._inventory(reclass)
+            applications = reclass.applications_inventory()
+            del applications['__reclass__']
+            self.assertEqual(applications['applications'], inventory['applications'])
+            self.assertEqual(applications['classes'], inventory['classes'])
+            for nodename, node in applications['nodes'].items():
+                self.assertEqual(node, reclass.applications_nodeinfo(nodename))
+                expected = inventory['nodes'][nodename]
+                self.assertEqual(node, {'classes': expected['classes'],
+                                        'applications': expected['applications'],
+                                        'environment': expected['environment']})
+
+    def test_inventory_stream(self):
+        for opts in ({}, {'jobs': 2}):
+            reclass = self._core('07', opts)
+            inventory = self._inventory(reclass)
+            items = reclass.inventory_stream()
+            self.assertEqual([key for key, value in items],
+                             ['__reclass__', 'nodes', 'classes', 'applications'])
+            stream = dict((key, value) for key, value in items[1:])
+            # the classes and applications are filled as the nodes are rendered
+            self.assertEqual(stream['applications'], {})
+            nodes = dict(stream['nodes'])
+            for node in nodes.values():
+                del node['__reclass__']['timestamp']
+            self.assertEqual(nodes, inventory['nodes'])
+            self.assertEqual(stream['classes'], inventory['classes'])
+            self.assertEqual(stream['applications'], inventory['applications'])
+
+    def test_inventory_merges_nodes_once(self):
+        reclass = self._core('07')
+        with mock.patch.object(reclass, '_node_entity', wraps=reclass._node_entity) as node_entity:
+            inventory = self._inventory(reclass)
+        self.assertEqual(node_entity.call_count, 4)
+        for nodename, node in inventory['nodes'].items():
+            expected = reclass.nodeinfo(nodename)
+            del expected['__reclass__']['timestamp']
+            self.assertEqual(node, expected)
+
+    def test_inventory_jobs(self):
+        serial = self._inventory(self._core('07'))
+        parallel = self._inventory(self._core('07', opts={'jobs': 2}))
+        self.assertEqual(parallel, serial)
+        self.assertEqual(list(parallel['nodes']), list(serial['nodes']))
+
+    @unittest.skipUnless(hasattr(multiprocessing, 'get_context'), 'needs start methods')
+    def test_inventory_jobs_spawn(self):
+        serial = self._inventory(self._core('07'))
+        reclass = self._core('07', opts={'jobs': 2})
+        # the nodes list is cached before the workers are started
+        reclass.nodeinfo('web1')
+        with mock.patch('multiprocessing.Pool', multiprocessing.get_context('spawn').Pool):
+            self.assertEqual(self._inventory(reclass), serial)
+
+    def test_inventory_preload(self):
+        plain = self._inventory(self._core('07'))
+        reclass = self._core('07', opts={'preload': 4})
+        with mock.patch.object(YamlData, 'from_file', wraps=YamlData.from_file) as from_file:
+            # all 4 nodes and 3 classes are read for the first node
+            reclass.nodeinfo('web1')
+            self.assertEqual(from_file.call_count, 7)
+            self.assertEqual(self._inventory(reclass), plain)
+            self.assertEqual(from_file.call_count, 7)
+
+    def test_class_merge_cache(self):
+        for dataset in ('02', '05', '07'):
+            uncached = self._inventory(self._core(dataset))
+            reclass = self._core(dataset, opts={'class_merge_cache': 100})
+            self.assertEqual(self._inventory(reclass), uncached)
+        # only the prefixes shared by two nodes, db and web, are kept
+        self.assertEqual(len(reclass._merge_cache), 2)
+        reclass = self._core('07', opts={'class_merge_cache': 1})
+        self.assertEqual(self._inventory(reclass), uncached)
+        self.assertEqual(len(reclass._merge_cache), 1)
+
+    def test_inventory_since(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        shutil.copytree(os.path.dirname(os.path.abspath(__file__)) + '/data/07',
+                        os.path.join(tmpdir, '07'))
+        state_file = os.path.join(tmpdir, 'state')
+
+        def inventory(state_file=None, opts={}):
+            nodes_uri, classes_uri = get_path_mangler('yaml_fs')(os.path.join(tmpdir, '07'), 'nodes', 'classes')
+            reclass = Core(get_storage('yaml_fs', nodes_uri, classes_uri, False), [], Settings(opts))
+            with mock.patch.object(reclass, '_nodeinfo', wraps=reclass._nodeinfo) as nodeinfo:
+                with mock.patch.object(Core, '_get_timestamp', return_value='now'):
+                    inventory = reclass.inventory(state_file)
+            del inventory['__reclass__']
+            for node in inventory['nodes'].values():
+                # also the nodes taken from the state
+                self.assertEqual(node['__reclass__'].pop('timestamp'), 'now')
+            return inventory, sorted(call[0][0] for call in nodeinfo.call_args_list)
+
+        full, _ = inventory()
+        self.assertEqual(inventory(state_file), (full, ['db1', 'db2', 'web1', 'web2']))
+        self.assertEqual(inventory(state_file), (full, []))
+
+        with open(os.path.join(tmpdir, '07', 'nodes', 'db1.yml'), 'a') as fp:
+            fp.write('  domain: example.com\n')
+        full, _ = inventory()
+        self.assertEqual(full['nodes']['web1']['parameters']['db_hosts']['db1'], 'db1.example.com')
+        self.assertEqual(inventory(state_file), (full, ['db1', 'web1', 'web2']))
+
+        with open(os.path.join(tmpdir, '07', 'classes', 'common.yml'), 'a') as fp:
+            fp.write('  extra: 1\n')
+        full, _ = inventory()
+        self.assertEqual(inventory(state_file), (full, ['db1', 'db2', 'web1', 'web2']))
+
+        # settings which do not change the rendered nodes keep the state
+        self.assertEqual(inventory(state_file, {'preload': 2, 'jobs': 2}), (full, []))
+
+    def test_inventory_since_missing_class(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        inventory_uri = os.path.join(tmpdir, '07')
+        shutil.copytree(os.path.dirname(os.path.abspath(__file__)) + '/data/07', inventory_uri)
+        state_file = os.path.join(tmpdir, 'state')
+        with open(os.path.join(inventory_uri, 'classes', 'kind.yml'), 'w') as fp:
+            fp.write('parameters:\n  kind: db\n')
+        with open(os.path.join(inventory_uri, 'nodes', 'db1.yml'), 'w') as fp:
+            fp.write('classes:\n  - kind\n  - db\n  - extra.${kind}\nparameters:\n  name: db1\n')
+
+        def inventory():
+            nodes_uri, classes_uri = get_path_mangler('yaml_fs')(inventory_uri, 'nodes', 'classes')
+            settings = Settings({'ignore_class_notfound': True,
+                                 'ignore_class_notfound_warning': False})
+            reclass = Core(get_storage('yaml_fs', nodes_uri, classes_uri, False), [], settings)
+            return reclass.inventory(state_file)['nodes']['db1']['parameters']
+
+        self.assertNotIn('extra', inventory())
+        # the class the reference resolves to is found on the next run
+        os.mkdir(os.path.join(inventory_uri, 'classes', 'extra'))
+        with open(os.path.join(inventory_uri, 'classes', 'extra', 'db.yml'), 'w') as fp:
+            fp.write('parameters:\n  extra: 1\n')
+        self.assertEqual(inventory()['extra'], 1)
+
+    def test_inventory_jobs_error(self):
+        reclass = self._core('01', opts={'jobs': 2})
+        with self.assertRaises(InvQueryClassNotFound):
+            reclass.inventory()
+
 if __name__ == '__main__':
     unittest.main()
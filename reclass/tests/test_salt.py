@@ -0,0 +1,79 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+
+from reclass.adapters import salt
+from reclass.storage.yamldata import YamlData
+
+import unittest
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+class TestSalt(unittest.TestCase):
+
+    def setUp(self):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        self.inventory_uri = os.path.join(tmpdir, '07')
+        shutil.copytree(os.path.dirname(os.path.abspath(__file__)) + '/data/07',
+                        self.inventory_uri)
+        self.addCleanup(salt._cores.clear)
+
+    def _ext_pillar(self, minion_id, **kwargs):
+        return salt.ext_pillar(minion_id, {}, inventory_base_uri=self.inventory_uri, **kwargs)
+
+    def test_ext_pillar_reuses_core(self):
+        with mock.patch.object(YamlData, 'from_file', wraps=YamlData.from_file) as from_file:
+            web1 = self._ext_pillar('web1')
+            count = from_file.call_count
+            self.assertEqual(self._ext_pillar('web1'), web1)
+            self.assertEqual(from_file.call_count, count)
+            # the inventory query of web1 has read all the nodes already
+            self._ext_pillar('web2')
+            self.assertEqual(from_file.call_count, count)
+        self.assertEqual(len(salt._cores), 1)
+
+    def test_ext_pillar_settings(self):
+        self._ext_pillar('web1')
+        self._ext_pillar('web1', ignore_class_notfound=True)
+        self.assertEqual(len(salt._cores), 2)
+
+    def test_ext_pillar_settings_bounded(self):
+        for n in range(salt._MAX_CORES + 2):
+            self._ext_pillar('web1', parse_cache_size=100 + n)
+        self.assertEqual(len(salt._cores), salt._MAX_CORES)
+
+    @mock.patch('time.time')
+    def test_ext_pillar_file_changed(self, now):
+        now.return_value = 1000.0
+        self.assertEqual(sorted(self._ext_pillar('web1')['db_hosts']), ['db1', 'db2'])
+        with open(os.path.join(self.inventory_uri, 'nodes', 'db3.yml'), 'w') as fp:
+            fp.write('classes:\n  - db\n')
+        # the files are only checked again after a while
+        now.return_value += salt._STAMP_INTERVAL - 1
+        self.assertEqual(sorted(self._ext_pillar('web1')['db_hosts']), ['db1', 'db2'])
+        # then the new node is found
+        now.return_value += 1
+        self.assertEqual(sorted(self._ext_pillar('web1')['db_hosts']), ['db1', 'db2', 'db3'])
+
+    def test_top(self):
+        top = salt.top(None, inventory_base_uri=self.inventory_uri)
+        self.assertEqual(sorted(top['base']), ['db1', 'db2', 'web1', 'web2'])
+        self.assertEqual(salt.top('web1', inventory_base_uri=self.inventory_uri),
+                         {'base': top['base']['web1']})
+
+
+if __name__ == '__main__':
+    unittest.main()
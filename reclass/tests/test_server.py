@@ -0,0 +1,113 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+
+from reclass import get_storage, get_path_mangler
+from reclass.core import Core
+from reclass.errors import InvocationError, NodeNotFound, PermissionError, ReclassException
+from reclass import server
+from reclass.server import ReclassServer, query
+from reclass.settings import Settings
+
+import unittest
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+class TestServer(unittest.TestCase):
+
+    def _core(self, inventory_uri=None):
+        if inventory_uri is None:
+            inventory_uri = os.path.dirname(os.path.abspath(__file__)) + '/data/07'
+        path_mangler = get_path_mangler('yaml_fs')
+        nodes_uri, classes_uri = path_mangler(inventory_uri, 'nodes', 'classes')
+        storage = get_storage('yaml_fs', nodes_uri, classes_uri, False)
+        return Core(storage, None, Settings())
+
+    def _start_server(self, make_core, name):
+        socket_path = os.path.join(self.tmpdir, name)
+        server = ReclassServer(socket_path, make_core)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(thread.join)
+        self.addCleanup(server.shutdown)
+        return server, socket_path
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+        self.server, self.socket_path = self._start_server(self._core, 'reclass.sock')
+
+    def test_nodeinfo(self):
+        data = query(self.socket_path, 'web1')
+        self.assertEqual(data['parameters']['db_hosts'],
+                         self._core().nodeinfo('web1')['parameters']['db_hosts'])
+
+    def test_inventory(self):
+        data = query(self.socket_path)
+        self.assertEqual(sorted(data['nodes']), ['db1', 'db2', 'web1', 'web2'])
+
+    def test_error(self):
+        with self.assertRaises(NodeNotFound):
+            query(self.socket_path, 'missing')
+
+    def test_broken_file(self):
+        inventory_uri = os.path.join(self.tmpdir, '07')
+        shutil.copytree(os.path.dirname(os.path.abspath(__file__)) + '/data/07',
+                        inventory_uri)
+        with open(os.path.join(inventory_uri, 'classes', 'common.yml'), 'w') as fp:
+            fp.write('parameters: [unclosed\n')
+        broken, socket_path = self._start_server(lambda: self._core(inventory_uri),
+                                                 'broken.sock')
+        with self.assertRaises(ReclassException) as e:
+            query(socket_path, 'web1')
+        self.assertIn('ParserError', e.exception.message)
+
+    def test_invalid_request(self):
+        for line in (b'not json\n', b'[1, 2]\n'):
+            sock = server._connect(self.socket_path)
+            try:
+                sock.sendall(line)
+                with sock.makefile('rb') as fp:
+                    ok, data = pickle.load(fp)
+            finally:
+                sock.close()
+            self.assertFalse(ok)
+            self.assertIsInstance(data, InvocationError)
+        # the server is still answering
+        self.assertIn('web1', query(self.socket_path)['nodes'])
+
+    def test_other_user(self):
+        with mock.patch.object(os, 'getuid', return_value=os.getuid() + 1):
+            with self.assertRaises(PermissionError):
+                query(self.socket_path, 'web1')
+            # the owner of the socket file is checked instead
+            with mock.patch.object(server, '_SO_PEERCRED', None):
+                with self.assertRaises(PermissionError):
+                    query(self.socket_path, 'web1')
+
+    def test_reload(self):
+        core = self.server.get_core()
+        self.assertIs(self.server.get_core(), core)
+        self.server.reload()
+        self.assertIsNot(self.server.get_core(), core)
+
+    def test_no_server(self):
+        self.assertIsNone(query(self.socket_path + '.missing', 'web1'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import fnmatch
+import re
+import shlex
+
+from reclass.errors import MappingFormatError
+
+_GLOB_CHARACTERS = re.compile(r'[*?[]')
+
+# older versions of the re module allow at most 100 groups in a pattern
+_GLOBS_PER_PATTERN = 90
+
+
+def _shlex_split(instr):
+    lexer = shlex.shlex(instr, posix=True)
+    lexer.whitespace_split = True
+    lexer.commenters = ''
+    regexp = False
+    if instr[0] == '/':
+        lexer.quotes += '/'
+        lexer.escapedquotes += '/'
+        regexp = True
+    try:
+        key = lexer.get_token()
+    except ValueError as e:
+        raise MappingFormatError('Error in mapping "{0}": missing closing '
+                                 'quote (or slash)'.format(instr))
+    if regexp:
+        key = '/{0}/'.format(key)
+    return key, list(lexer)
+
+
+def _translate_glob(glob):
+    pattern = fnmatch.translate(glob)
+    # Python 2 puts the flags at the end, which is not allowed once the
+    # pattern is part of another one: they are given to re.compile instead
+    if pattern.endswith('(?ms)'):
+        pattern = pattern[:-len('(?ms)')]
+    return pattern
+
+
+class ClassMappings(object):
+    '''
+    The class mappings, parsed once, and compiled for matching node names.
+
+    A mapping is a glob, or a regular expression between slashes, followed
+    by the classes of the nodes whose name matches it. Globs without
+    wildcards are looked up in a dictionary. The other globs are matched
+    all at once with a pattern made of an optional lookahead per glob,
+    which records the globs that match in a named group. The regular
+    expressions are matched one by one, as the classes can refer to their
+    groups.
+    '''
+
+    def __init__(self, mappings):
+        self._classes = []
+        self._names = {}
+        self._globs = []
+        self._regexps = []
+        globs = []
+        for n, mapping in enumerate(mappings):
+            key, klasses = _shlex_split(mapping)
+            self._classes.append(klasses)
+            if key[0] == ('/'):
+                self._regexps.append((n, re.compile(key[1:-1])))
+            elif _GLOB_CHARACTERS.search(key) is None:
+                self._names.setdefault(key, []).append(n)
+            else:
+                globs.append((n, key))
+        for i in range(0, len(globs), _GLOBS_PER_PATTERN):
+            chunk = globs[i:i + _GLOBS_PER_PATTERN]
+            # the markers are named, as the translated globs may have groups
+            # of their own (from Python 3.9, for globs with several stars)
+            pattern = ''.join('(?:(?={0})(?P<m{1}>))?'.format(_translate_glob(glob), n)
+                              for n, glob in chunk)
+            self._globs.append((re.compile(pattern, re.M | re.S),
+                                [n for n, glob in chunk]))
+
+    def get_classes(self, name):
+        '''
+        Returns the classes the mappings give to the node name, in the order
+        of the mappings.
+        '''
+        matches = [(n, self._classes[n]) for n in self._names.get(name, ())]
+        for pattern, indices in self._globs:
+            groups = pattern.match(name).groupdict()
+            matches.extend((n, self._classes[n]) for n in indices
+                           if groups['m{0}'.format(n)] is not None)
+        for n, regexp in self._regexps:
+            matched = regexp.search(name)
+            if matched:
+                matches.append((n, [matched.expand(klass)
+                                    for klass in self._classes[n]]))
+        matches.sort(key=lambda match: match[0])
+        return [klass for n, klasses in matches for klass in klasses]
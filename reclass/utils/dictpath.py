@@ -13,6 +13,12 @@ from __future__ import unicode_literals
 
 import six
 import re
+import weakref
+
+
+def _split_string(delim, string):
+    return tuple(re.split(r'(?<!\\)' + re.escape(delim), string))
+
 
 class DictPath(object):
     '''
@@ -57,22 +63,54 @@ class DictPath(object):
     names) will always be strings. Therefore it is okay to interpret each
     component of the path as a string, unless one finds a list at the current
     level down the nested dictionary.
+
+    DictPath objects are immutable: the methods which derive a path from
+    another return a new DictPath. Paths are used as dictionary keys all the
+    time during interpolation, so the hash is computed once, and the paths
+    made from a string are interned while they are in use, which spares
+    splitting every reference string again. A path hashes like its string representation, so that
+    dictionaries keyed by paths can be looked up with strings.
     '''
 
-    def __init__(self, delim, contents=None):
+    __slots__ = ('_delim', '_parts', '_hash', '__weakref__')
+
+    # (delimiter, string) → DictPath, forgotten when no longer used, so that
+    # long lived processes do not keep the paths of every model they rendered
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, delim, contents=None):
+        if isinstance(contents, six.string_types):
+            key = (delim, contents)
+            try:
+                return cls._interned[key]
+            except KeyError:
+                pass
+            self = cls._make(delim, _split_string(delim, contents))
+            cls._interned[key] = self
+            return self
+        if contents is None:
+            return cls._make(delim, ())
+        if isinstance(contents, (list, tuple)):
+            return cls._make(delim, tuple(contents))
+        raise TypeError('DictPath() takes string or list, '\
+                            'not %s' % type(contents))
+
+    @classmethod
+    def _make(cls, delim, parts):
+        self = object.__new__(cls)
         self._delim = delim
+        self._parts = parts
+        self._hash = None
+        return self
 
-        if contents is None:
-            self._parts = []
-        elif isinstance(contents, list):
-            self._parts = contents
-        elif isinstance(contents, six.string_types):
-            self._parts = self._split_string(contents)
-        elif isinstance(contents, tuple):
-            self._parts = list(contents)
-        else:
-            raise TypeError('DictPath() takes string or list, '\
-                                'not %s' % type(contents))
+    def __reduce__(self):
+        return (self.__class__, (self._delim, self._parts))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
         return "DictPath(%r, %r)" % (self._delim, str(self))
@@ -81,18 +119,21 @@ class DictPath(object):
         return self._delim.join(str(i) for i in self._parts)
 
     def __eq__(self, other):
-        if not (isinstance(other, six.string_types) or
-                isinstance(other, self.__class__)):
-            return False
+        if self is other:
+            return True
         if isinstance(other, six.string_types):
-            other = DictPath(self._delim, other)
+            return self._parts == _split_string(self._delim, other)
+        if not isinstance(other, self.__class__):
+            return False
         return self._parts == other._parts and self._delim == other._delim
 
     def __ne__(self, other):
         return not self.__eq__(other)
 
     def __hash__(self):
-        return hash(str(self))
+        if self._hash is None:
+            self._hash = hash(str(self))
+        return self._hash
 
     @property
     def path(self):
@@ -105,21 +146,21 @@ class DictPath(object):
 
     def _get_innermost_container(self, base):
         container = base
-        for i in self.path[:-1]:
+        for i in self._parts[:-1]:
             if isinstance(container, (list, tuple)):
                 container = container[int(i)]
             else:
                 container = container[i]
         return container
 
-    def _split_string(self, string):
-        return re.split(r'(?<!\\)' + re.escape(self._delim), string)
-
     def key_parts(self):
         return self._parts[:-1]
 
     def new_subpath(self, key):
-        return DictPath(self._delim, self._parts + [key])
+        return self._make(self._delim, self._parts + (key,))
+
+    def new_ancestor(self, key):
+        return self._make(self._delim, (key,) + self._parts)
 
     def get_value(self, base):
         return self._get_innermost_container(base)[self._get_key()]
@@ -128,8 +169,7 @@ class DictPath(object):
         self._get_innermost_container(base)[self._get_key()] = value
 
     def drop_first(self):
-        del self._parts[0]
-        return self
+        return self._make(self._delim, self._parts[1:])
 
     def is_empty(self):
         return len(self._parts) == 0
@@ -137,19 +177,10 @@ class DictPath(object):
     def delete(self, base):
         del self._get_innermost_container(base)[self._get_key()]
 
-    def add_subpath(self, key):
-        self._parts.append(key)
-
-    def add_ancestor(self, key):
-        self._parts.insert(0, key)
-
     def is_ancestor_of(self, other):
         if len(other._parts) <= len(self._parts):
             return False
-        for i in range(len(self._parts)):
-            if other._parts[i] != self._parts[i]:
-                return False
-        return True
+        return other._parts[:len(self._parts)] == self._parts
 
     def exists_in(self, container):
         item = container
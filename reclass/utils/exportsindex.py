@@ -0,0 +1,86 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from six import iteritems
+
+class ExportsIndex(dict):
+    '''
+    The exports of all nodes (a dict of node names to exports), indexed for
+    the inventory queries.
+
+    Every export path used in a query is looked up once in the exports of
+    every node, and the values found are kept for the following queries.
+    Nodes with a given value at a path are found with a dict lookup on the
+    values at that path, instead of comparing the value of every node.
+
+    The index is built as the queries need it, and assumes the exports are
+    no longer changed once they are put in an ExportsIndex.
+    '''
+
+    def __init__(self, *args, **kwargs):
+        super(ExportsIndex, self).__init__(*args, **kwargs)
+        self._values = {}
+        self._equal = {}
+        self._order = None
+
+    def get_values(self, path):
+        '''
+        Returns a dict of the nodes that have the export path to the value
+        at the path.
+        '''
+        try:
+            return self._values[path]
+        except KeyError:
+            pass
+        values = {}
+        for node, exports in iteritems(self):
+            if path.exists_in(exports):
+                values[node] = path.get_value(exports)
+        self._values[path] = values
+        return values
+
+    def _get_equality_index(self, path):
+        try:
+            return self._equal[path]
+        except KeyError:
+            pass
+        index = {}
+        unhashable = []
+        for node, value in iteritems(self.get_values(path)):
+            try:
+                index.setdefault(value, set()).add(node)
+            except TypeError:
+                # lists and dicts are compared one by one
+                unhashable.append((node, value))
+        self._equal[path] = (index, unhashable)
+        return index, unhashable
+
+    def get_nodes(self, path, value):
+        '''
+        Returns the set of nodes whose export at path is equal to value.
+        '''
+        index, unhashable = self._get_equality_index(path)
+        try:
+            nodes = set(index.get(value, ()))
+        except TypeError:
+            return set(node for node, v in iteritems(self.get_values(path))
+                       if v == value)
+        nodes.update(node for node, v in unhashable if v == value)
+        return nodes
+
+    def sort_nodes(self, nodes):
+        '''
+        Returns the nodes as a list in the order of the exports.
+        '''
+        if self._order is None:
+            self._order = dict((node, i) for i, node in enumerate(self))
+        return sorted(nodes, key=self._order.__getitem__)
@@ -0,0 +1,46 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+# Released under the terms of the Artistic Licence 2.0
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    '''
+    A cache keeping the values of at most maxsize keys, dropping the least
+    recently used ones. The size is given to put(), so that it can follow
+    the parse_cache_size setting of the callers.
+    '''
+
+    def __init__(self):
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        '''
+        Returns the value of key, or None if it is not in the cache.
+        '''
+        value = self._data.pop(key, None)
+        if value is not None:
+            self._data[key] = value
+        return value
+
+    def put(self, key, value, maxsize):
+        if maxsize <= 0:
+            return
+        self._data[key] = value
+        while len(self._data) > maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
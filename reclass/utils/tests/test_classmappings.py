@@ -0,0 +1,78 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pickle
+
+from reclass.errors import MappingFormatError
+from reclass.utils import classmappings
+from reclass.utils.classmappings import ClassMappings
+import unittest
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+MAPPINGS = ['* all',
+            'web1.example.com web1',
+            'web* web',
+            r'/^(db|web)(\d+)\./ role.\\1 number.\\2',
+            'db? db',
+            '"web1.example.com" web1 web1again']
+
+class TestClassMappings(unittest.TestCase):
+
+    def setUp(self):
+        self.mappings = ClassMappings(MAPPINGS)
+
+    def test_get_classes_order(self):
+        self.assertEqual(self.mappings.get_classes('web1.example.com'),
+                         ['all', 'web1', 'web', 'role.web', 'number.1',
+                          'web1', 'web1again'])
+
+    def test_get_classes_glob(self):
+        self.assertEqual(self.mappings.get_classes('db2'), ['all', 'db'])
+        self.assertEqual(self.mappings.get_classes('db22'), ['all'])
+
+    def test_get_classes_regexp(self):
+        self.assertEqual(self.mappings.get_classes('db22.example.com'),
+                         ['all', 'role.db', 'number.22'])
+
+    def test_many_globs(self):
+        mappings = ClassMappings(['node{0}* class{0}'.format(i) for i in range(250)])
+        self.assertEqual(mappings.get_classes('node12'),
+                         ['class1', 'class12'])
+
+    def _check_several_stars(self):
+        mappings = ClassMappings(['a*b*c one', '*.example.org two', 'web* three'])
+        self.assertEqual(mappings.get_classes('axbxc'), ['one'])
+        self.assertEqual(mappings.get_classes('web1.example.org'), ['two', 'three'])
+        self.assertEqual(mappings.get_classes('web1'), ['three'])
+
+    def test_glob_with_several_stars(self):
+        self._check_several_stars()
+        # Python 3.9 and 3.10 translate such globs with groups of their own
+        translate_glob = classmappings._translate_glob
+        def translate(glob):
+            if glob == 'a*b*c':
+                return r'(?s:a(?=(?P<g0>.*?b))(?P=g0).*c)\Z'
+            return translate_glob(glob)
+        with mock.patch.object(classmappings, '_translate_glob', translate):
+            self._check_several_stars()
+
+    def test_missing_slash(self):
+        with self.assertRaises(MappingFormatError):
+            ClassMappings(['/web.* web'])
+
+    def test_pickle(self):
+        mappings = pickle.loads(pickle.dumps(self.mappings, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(mappings.get_classes('db2'), ['all', 'db'])
+
+if __name__ == '__main__':
+    unittest.main()
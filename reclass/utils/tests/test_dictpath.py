@@ -12,32 +12,34 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from reclass.utils.dictpath import DictPath
+import gc
+import pickle
 import unittest
 
 class TestDictPath(unittest.TestCase):
 
     def test_constructor0(self):
         p = DictPath(':')
-        self.assertListEqual(p._parts, [])
+        self.assertTupleEqual(p._parts, ())
 
     def test_constructor_list(self):
         l = ['a', 'b', 'c']
         p = DictPath(':', l)
-        self.assertListEqual(p._parts, l)
+        self.assertTupleEqual(p._parts, tuple(l))
 
     def test_constructor_str(self):
         delim = ':'
         s = 'a{0}b{0}c'.format(delim)
         l = ['a', 'b', 'c']
         p = DictPath(delim, s)
-        self.assertListEqual(p._parts, l)
+        self.assertTupleEqual(p._parts, tuple(l))
 
     def test_constructor_str_escaped(self):
         delim = ':'
         s = 'a{0}b\{0}b{0}c'.format(delim)
         l = ['a', 'b\\{0}b'.format(delim), 'c']
         p = DictPath(delim, s)
-        self.assertListEqual(p._parts, l)
+        self.assertTupleEqual(p._parts, tuple(l))
 
     def test_constructor_invalid_type(self):
         with self.assertRaises(TypeError):
@@ -79,13 +81,13 @@ class TestDictPath(unittest.TestCase):
     def test_path_accessor(self):
         l = ['a', 'b', 'c']
         p = DictPath(':', l)
-        self.assertListEqual(p.path, l)
+        self.assertTupleEqual(p.path, tuple(l))
 
     def test_new_subpath(self):
         l = ['a', 'b', 'c']
         p = DictPath(':', l[:-1])
         p = p.new_subpath(l[-1])
-        self.assertListEqual(p.path, l)
+        self.assertTupleEqual(p.path, tuple(l))
 
     def test_get_value(self):
         v = 42
@@ -159,5 +161,30 @@ class TestDictPath(unittest.TestCase):
         with self.assertRaises(KeyError):
             p.set_value(dict(), 42)
 
+    def test_immutable(self):
+        p = DictPath(':', 'a:b')
+        self.assertEqual(p.new_subpath('c'), DictPath(':', 'a:b:c'))
+        self.assertEqual(p.new_ancestor('c'), DictPath(':', 'c:a:b'))
+        self.assertEqual(p.drop_first(), DictPath(':', 'b'))
+        self.assertEqual(p, DictPath(':', ['a', 'b']))
+
+    def test_interned(self):
+        self.assertIs(DictPath(':', 'a:b'), DictPath(':', 'a:b'))
+
+    def test_interned_released(self):
+        p = DictPath(':', 'released:path')
+        self.assertEqual(p, 'released:path')
+        del p
+        gc.collect()
+        self.assertNotIn((':', 'released:path'), DictPath._interned)
+
+    def test_hash_string(self):
+        d = {DictPath(':', ['a', 'b']): 1}
+        self.assertEqual(d['a:b'], 1)
+
+    def test_pickle(self):
+        p = DictPath(':', ['a', 'b'])
+        self.assertEqual(pickle.loads(pickle.dumps(p, 2)), p)
+
 if __name__ == '__main__':
     unittest.main()
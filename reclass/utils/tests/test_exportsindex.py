@@ -0,0 +1,53 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pickle
+
+from reclass.utils.dictpath import DictPath
+from reclass.utils.exportsindex import ExportsIndex
+import unittest
+
+EXPORTS = {'node1': {'role': 'db', 'net': {'ip': '10.0.0.1'}, 'tags': ['a']},
+           'node2': {'role': 'web', 'net': {'ip': '10.0.0.2'}},
+           'node3': {'role': 'db', 'tags': ['a', 'b']}}
+
+class TestExportsIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ExportsIndex(EXPORTS)
+
+    def test_get_values(self):
+        path = DictPath(':', 'net:ip')
+        self.assertEqual(self.index.get_values(path),
+                         {'node1': '10.0.0.1', 'node2': '10.0.0.2'})
+        self.assertIs(self.index.get_values(DictPath(':', 'net:ip')),
+                      self.index.get_values(path))
+
+    def test_get_nodes(self):
+        path = DictPath(':', 'role')
+        self.assertEqual(self.index.get_nodes(path, 'db'), set(['node1', 'node3']))
+        self.assertEqual(self.index.get_nodes(path, 'cache'), set())
+
+    def test_get_nodes_unhashable(self):
+        path = DictPath(':', 'tags')
+        self.assertEqual(self.index.get_nodes(path, ['a']), set(['node1']))
+        self.assertEqual(self.index.get_nodes(path, 'a'), set())
+
+    def test_sort_nodes(self):
+        self.assertEqual(self.index.sort_nodes(set(self.index)), list(self.index))
+
+    def test_pickle(self):
+        self.index.get_values(DictPath(':', 'role'))
+        index = pickle.loads(pickle.dumps(self.index, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(index, EXPORTS)
+        self.assertEqual(index.get_nodes(DictPath(':', 'role'), 'web'), set(['node2']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,33 @@
+#
+# -*- coding: utf-8 -*-
+#
+# This file is part of reclass (http://github.com/madduck/reclass)
+#
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from reclass.utils.lrucache import LRUCache
+import unittest
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_drops_least_recently_used(self):
+        cache = LRUCache()
+        cache.put('a', 1, 2)
+        cache.put('b', 2, 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3, 2)
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+
+    def test_disabled(self):
+        cache = LRUCache()
+        cache.put('a', 1, 0)
+        self.assertIsNone(cache.get('a'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,8 @@ from reclass.values import item
 
 class CompItem(item.ItemWithReferences):
 
+    __slots__ = ()
+
     type = item.ItemTypes.COMPOSITE
 
     def merge_over(self, other):
@@ -9,4 +9,6 @@ from reclass.values import item
 
 class DictItem(item.ContainerItem):
 
+    __slots__ = ()
+
     type = item.ItemTypes.DICTIONARY
@@ -20,6 +20,8 @@ from reclass.values import item
 from reclass.values import parser_funcs
 from reclass.settings import Settings
 from reclass.utils.dictpath import DictPath
+from reclass.utils.exportsindex import ExportsIndex
+from reclass.utils.lrucache import LRUCache
 from reclass.errors import ExpressionError, ParseError, ResolveError
 
 
@@ -51,7 +53,7 @@ class EqualityTest(BaseTestExpression):
         _ = self._get_vars(expression[2][1], *self._get_vars(expression[0][1]))
         self._export_path, self._parameter_path, self._parameter_value = _
         try:
-            self._export_path.drop_first()
+            self._export_path = self._export_path.drop_first()
         except AttributeError:
             raise ExpressionError('No export')
         try:
@@ -61,20 +63,21 @@ class EqualityTest(BaseTestExpression):
             raise ExpressionError(msg, tbFlag=False)
         self.inv_refs = [self._export_path]
         if self._parameter_path is not None:
-            self._parameter_path.drop_first()
+            self._parameter_path = self._parameter_path.drop_first()
             self.refs = [str(self._parameter_path)]
 
-    def value(self, context, items):
+    def nodes(self, context, inventory):
         if self._parameter_path is not None:
-            self._parameter_value = self._resolve(self._parameter_path,
-                                                  context)
-        if self._parameter_value is None:
+            value = self._resolve(self._parameter_path, context)
+        else:
+            value = self._parameter_value
+        if value is None:
             raise ExpressionError('Failed to render %s' % str(self),
                                   tbFlag=False)
-        if self._export_path.exists_in(items):
-            export_value = self._resolve(self._export_path, items)
-            return self._compare(export_value, self._parameter_value)
-        return False
+        nodes = inventory.get_nodes(self._export_path, value)
+        if self._compare is operator.ne:
+            nodes = set(inventory.get_values(self._export_path)) - nodes
+        return nodes
 
     def _resolve(self, path, dictionary):
         try:
@@ -119,65 +122,91 @@ class LogicTest(BaseTestExpression):
             msg = 'Unknown operator {0} {1}'.format(e.messsage, self._els)
             raise ExpressionError(msg, tbFlag=False)
 
-    def value(self, context, items):
+    def nodes(self, context, inventory):
         if len(self._els) == 0:  # NOTE: possible logic error
-            return True
-        result = self._els[0].value(context, items)
+            return set(inventory)
+        result = self._els[0].nodes(context, inventory)
         for op, next_el in zip(self._ops, self._els[1:]):
-            result = op(result, next_el.value(context, items))
+            result = op(result, next_el.nodes(context, inventory))
         return result
 
 
+# The expression grammar does not depend on the settings, so it is built only
+# once. Parsed expressions are kept by their text and delimiter and shared by
+# all the InvItems made from the same query, whatever node or class they are
+# in, so nothing in them is changed after parsing. At most parse_cache_size
+# expressions are kept, like parsed strings.
+_expression_parser = None
+_parsed_expressions = LRUCache()
+
+def _parse_expression(expr, settings):
+    delimiter = settings.delimiter
+    key = (expr, delimiter)
+    parsed = _parsed_expressions.get(key)
+    if parsed is not None:
+        return parsed
+
+    global _expression_parser
+    if _expression_parser is None:
+        _expression_parser = parser_funcs.get_expression_parser()
+    try:
+        tokens = _expression_parser.parseString(expr).asList()
+    except pp.ParseException as e:
+        raise ParseError(e.msg, e.line, e.col, e.lineno)
+
+    options = None
+    if len(tokens) == 2:  # options are set
+        options = tuple(x[1] for x in tokens.pop(0))
+    elif len(tokens) > 2:
+        raise ExpressionError('Failed to parse %s' % str(tokens),
+                              tbFlag=False)
+    expr_type = tokens[0][0]
+    expr_list = list(tokens[0][1])
+
+    if expr_type == parser_funcs.VALUE:
+        value_path = DictPath(delimiter, expr_list[0][1]).drop_first()
+        question = LogicTest([], delimiter)
+        inv_refs = [value_path]
+    elif expr_type == parser_funcs.TEST:
+        value_path = DictPath(delimiter, expr_list[0][1]).drop_first()
+        question = LogicTest(expr_list[2:], delimiter)
+        inv_refs = question.inv_refs + [value_path]
+    elif expr_type == parser_funcs.LIST_TEST:
+        value_path = None
+        question = LogicTest(expr_list[1:], delimiter)
+        inv_refs = question.inv_refs
+    else:
+        msg = 'Unknown expression type: %s'
+        raise ExpressionError(msg % expr_type, tbFlag=False)
+
+    parsed = (options, expr_type, expr_list, value_path, question, inv_refs)
+    _parsed_expressions.put(key, parsed, settings.parse_cache_size)
+    return parsed
+
+
 class InvItem(item.Item):
 
+    __slots__ = ('needs_all_envs', 'ignore_failed_render', '_expr_type',
+                 '_expr', '_value_path', '_question', 'refs', 'inv_refs')
+
     type = item.ItemTypes.INV_QUERY
+    has_inv_query = True
 
     def __init__(self, newitem, settings):
         super(InvItem, self).__init__(newitem.render(None, None), settings)
         self.needs_all_envs = False
-        self.has_inv_query = True
         self.ignore_failed_render = (
                 self._settings.inventory_ignore_failed_render)
         self._parse_expression(self.contents)
 
     def _parse_expression(self, expr):
-        parser = parser_funcs.get_expression_parser()
-        try:
-            tokens = parser.parseString(expr).asList()
-        except pp.ParseException as e:
-            raise ParseError(e.msg, e.line, e.col, e.lineno)
-
-        if len(tokens) == 2:  # options are set
-            passed_opts = [x[1] for x in tokens.pop(0)]
-            self.ignore_failed_render = parser_funcs.IGNORE_ERRORS in passed_opts
-            self.needs_all_envs = parser_funcs.ALL_ENVS in passed_opts
-        elif len(tokens) > 2:
-            raise ExpressionError('Failed to parse %s' % str(tokens),
-                                  tbFlag=False)
-        self._expr_type = tokens[0][0]
-        self._expr = list(tokens[0][1])
-
-        if self._expr_type == parser_funcs.VALUE:
-            self._value_path = DictPath(self._settings.delimiter,
-                                        self._expr[0][1]).drop_first()
-            self._question = LogicTest([], self._settings.delimiter)
-            self.refs = []
-            self.inv_refs = [self._value_path]
-        elif self._expr_type == parser_funcs.TEST:
-            self._value_path = DictPath(self._settings.delimiter,
-                                        self._expr[0][1]).drop_first()
-            self._question = LogicTest(self._expr[2:], self._settings.delimiter)
-            self.refs = self._question.refs
-            self.inv_refs = self._question.inv_refs
-            self.inv_refs.append(self._value_path)
-        elif self._expr_type == parser_funcs.LIST_TEST:
-            self._value_path = None
-            self._question = LogicTest(self._expr[1:], self._settings.delimiter)
-            self.refs = self._question.refs
-            self.inv_refs = self._question.inv_refs
-        else:
-            msg = 'Unknown expression type: %s'
-            raise ExpressionError(msg % self._expr_type, tbFlag=False)
+        parsed = _parse_expression(expr, self._settings)
+        (options, self._expr_type, self._expr, self._value_path,
+         self._question, self.inv_refs) = parsed
+        if options is not None:
+            self.ignore_failed_render = parser_funcs.IGNORE_ERRORS in options
+            self.needs_all_envs = parser_funcs.ALL_ENVS in options
+        self.refs = self._question.refs
 
     @property
     def has_references(self):
@@ -192,18 +221,10 @@ class InvItem(item.Item):
     def get_inv_references(self):
         return self.inv_refs
 
-    def _resolve(self, path, dictionary):
-        try:
-            return path.get_value(dictionary)
-        except KeyError as e:
-            raise ResolveError(str(path))
-
     def _value_expression(self, inventory):
         results = {}
-        for (node, items) in iteritems(inventory):
-            if self._value_path.exists_in(items):
-                results[node] = copy.deepcopy(self._resolve(self._value_path,
-                                              items))
+        for node, value in iteritems(inventory.get_values(self._value_path)):
+            results[node] = copy.deepcopy(value)
         return results
 
     def _test_expression(self, context, inventory):
@@ -212,21 +233,22 @@ class InvItem(item.Item):
             raise ExpressionError(msg % str(self), tbFlag=False)
 
         results = {}
-        for node, items in iteritems(inventory):
-            if (self._question.value(context, items) and
-                    self._value_path.exists_in(items)):
-                results[node] = copy.deepcopy(
-                    self._resolve(self._value_path, items))
+        if len(inventory) == 0:
+            return results
+        nodes = self._question.nodes(context, inventory)
+        for node, value in iteritems(inventory.get_values(self._value_path)):
+            if node in nodes:
+                results[node] = copy.deepcopy(value)
         return results
 
     def _list_test_expression(self, context, inventory):
-        results = []
-        for (node, items) in iteritems(inventory):
-            if self._question.value(context, items):
-                results.append(node)
-        return results
+        if len(inventory) == 0:
+            return []
+        return inventory.sort_nodes(self._question.nodes(context, inventory))
 
     def render(self, context, inventory):
+        if not isinstance(inventory, ExportsIndex):
+            inventory = ExportsIndex(inventory)
         if self._expr_type == parser_funcs.VALUE:
             return self._value_expression(inventory)
         elif self._expr_type == parser_funcs.TEST:
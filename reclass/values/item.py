@@ -19,10 +19,14 @@ ItemTypes = Enum('ItemTypes',
 
 class Item(object):
 
+    # items are the leaves of the parameter trees, there are a lot of them
+    __slots__ = ('_settings', 'contents')
+
+    has_inv_query = False
+
     def __init__(self, item, settings):
         self._settings = settings
         self.contents = item
-        self.has_inv_query = False
 
     def allRefs(self):
         return True
@@ -55,6 +59,8 @@ class Item(object):
 
 class ItemWithReferences(Item):
 
+    __slots__ = ('_refs', 'allRefs')
+
     def __init__(self, items, settings):
         super(ItemWithReferences, self).__init__(items, settings)
         try:
@@ -85,6 +91,8 @@ class ItemWithReferences(Item):
 
 class ContainerItem(Item):
 
+    __slots__ = ()
+
     def is_container(self):
         return True
 
@@ -9,6 +9,8 @@ from reclass.values import item
 
 class ListItem(item.ContainerItem):
 
+    __slots__ = ()
+
     type = item.ItemTypes.LIST
 
     def merge_over(self, other):
@@ -16,6 +16,7 @@ from .refitem import RefItem
 from .scaitem import ScaItem
 
 from reclass.errors import ParseError
+from reclass.utils.lrucache import LRUCache
 from reclass.values.parser_funcs import tags
 import reclass.values.parser_funcs as parsers
 
@@ -23,31 +24,88 @@ import collections
 import six
 
 
+ParseCacheInfo = collections.namedtuple('ParseCacheInfo',
+                                        ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+# the grammars built for each escape character and sentinels, the only
+# settings they depend on, shared by all parsers
+_grammars = {}
+
+def _get_grammar(factory, settings):
+    key = (factory, settings.escape_character, settings.reference_sentinels,
+           settings.export_sentinels)
+    try:
+        return _grammars[key]
+    except KeyError:
+        grammar = factory(settings)
+        _grammars[key] = grammar
+        return grammar
+
+
 class Parser(object):
 
     def __init__(self):
         self._ref_parser = None
         self._simple_parser = None
-        self._old_settings = None
+        self._ref_scanner = None
+        self._ref_settings = None
+        self._simple_settings = None
+        self._scanner_settings = None
+        # least recently used cache of the tokens of parsed strings, the
+        # items are created from the tokens again on every call as they are
+        # modified while rendering
+        self._cache = LRUCache()
+        self._cache_maxsize = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    def cache_info(self):
+        return ParseCacheInfo(self._cache_hits, self._cache_misses,
+                              self._cache_maxsize, len(self._cache))
+
+    def cache_clear(self):
+        self._cache.clear()
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+    # Settings are immutable, so the grammar only needs looking up again when
+    # parsing with another Settings object.
 
     @property
     def ref_parser(self):
-        if self._ref_parser is None or self._settings != self._old_settings:
-            self._ref_parser = parsers.get_ref_parser(self._settings)
-            self._old_settings = self._settings
+        if self._settings is not self._ref_settings:
+            self._ref_parser = _get_grammar(parsers.get_ref_parser,
+                                            self._settings)
+            self._ref_settings = self._settings
         return self._ref_parser
 
     @property
     def simple_ref_parser(self):
-        if self._simple_parser is None or self._settings != self._old_settings:
-            self._simple_parser = parsers.get_simple_ref_parser(self._settings)
-            self._old_settings = self._settings
+        if self._settings is not self._simple_settings:
+            self._simple_parser = _get_grammar(parsers.get_simple_ref_parser,
+                                               self._settings)
+            self._simple_settings = self._settings
         return self._simple_parser
 
+    @property
+    def ref_scanner(self):
+        if self._settings is not self._scanner_settings:
+            self._ref_scanner = _get_grammar(parsers.get_ref_scanner,
+                                             self._settings)
+            self._scanner_settings = self._settings
+        return self._ref_scanner
+
     def parse(self, value, settings):
         def full_parse():
             try:
-                return self.ref_parser.parseString(value)
+                return parsers.listify(self.ref_parser.parseString(value))
+            except pp.ParseException as e:
+                raise ParseError(e.msg, e.line, e.col, e.lineno)
+
+        def scan():
+            try:
+                return self.ref_scanner.scan(value)
             except pp.ParseException as e:
                 raise ParseError(e.msg, e.line, e.col, e.lineno)
 
@@ -57,15 +115,29 @@ class Parser(object):
         if sentinel_count == 0:
             # speed up: only use pyparsing if there are sentinels in the value
             return ScaItem(value, self._settings)
-        elif sentinel_count == 1:  # speed up: try a simple reference
-            try:
-                tokens = self.simple_ref_parser.parseString(value)
-            except pp.ParseException:
-                tokens = full_parse()  # fall back on the full parser
+
+        # the parse result depends on the sentinels and escape character
+        key = (value, settings.escape_character,
+               tuple(settings.reference_sentinels),
+               tuple(settings.export_sentinels))
+        self._cache_maxsize = settings.parse_cache_size
+        tokens = self._cache.get(key)
+        if tokens is None:
+            self._cache_misses += 1
+            if settings.reference_parser == 'scanner':
+                tokens = scan()
+            elif sentinel_count == 1:  # speed up: try a simple reference
+                try:
+                    tokens = self.simple_ref_parser.parseString(value)
+                    tokens = parsers.listify(tokens)
+                except pp.ParseException:
+                    tokens = full_parse()  # fall back on the full parser
+            else:
+                tokens = full_parse()  # use the full parser
+            self._cache.put(key, tokens, self._cache_maxsize)
         else:
-            tokens = full_parse()  # use the full parser
+            self._cache_hits += 1
 
-        tokens = parsers.listify(tokens)
         items = self._create_items(tokens)
         if len(items) == 1:
             return items[0]
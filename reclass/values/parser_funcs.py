@@ -181,3 +181,155 @@ def get_simple_ref_parser(settings):
     reference = (ref_open + pp.Group(string) + ref_close).setParseAction(_tag_with(tags.REF))
     line = pp.StringStart() + pp.Optional(string) + reference + pp.Optional(string) + s_end
     return line.leaveWhitespace()
+
+
+class _RefScanner(object):
+    '''
+    Hand written scanner for references and exports, producing the same
+    tokens as listify() applied to the result of the parser built by
+    get_ref_parser, in a single pass over the string without pyparsing.
+    '''
+
+    class _NoMatch(Exception):
+        pass
+
+    def __init__(self, settings):
+        esc = settings.escape_character
+        double_esc = esc + esc
+        ref_open, ref_close = settings.reference_sentinels
+        inv_open, inv_close = settings.export_sentinels
+
+        self._ref_open = ref_open
+        self._ref_close = ref_close
+        self._inv_open = inv_open
+        self._inv_close = inv_close
+        self._esc = esc
+        self._double_esc = double_esc
+        self._sentinels = (ref_open, ref_close, inv_open, inv_close)
+        self._whitespace = pp.ParserElement.DEFAULT_WHITE_CHARS
+
+        # escaped sentinels recognised at the start of a string token, in
+        # the order they are tried by the pyparsing grammar
+        self._escapes = [(esc + ref_open, ref_open), (esc + inv_open, inv_open)]
+        self._ref_escapes = [(esc + ref_open, ref_open), (esc + ref_close, ref_close)]
+        self._inv_escapes = [(esc + inv_open, inv_open), (esc + inv_close, inv_close)]
+
+        # a string token ends before any of these
+        self._stops = (ref_open, esc + ref_open, double_esc + ref_open,
+                       inv_open, esc + inv_open, double_esc + inv_open)
+        self._ref_stops = (ref_open, esc + ref_open, double_esc + ref_open,
+                           ref_close, esc + ref_close, double_esc + ref_close)
+        self._inv_stops = (inv_close, esc + inv_close, double_esc + inv_close)
+
+    def scan(self, value):
+        # like pyparsing's parseString
+        value = value.expandtabs()
+        tokens = []
+        pos = 0
+        while pos < len(value):
+            try:
+                token, pos = self._item(value, pos)
+            except self._NoMatch as e:
+                raise pp.ParseException(value, e.args[0], 'Expected end of text')
+            tokens.append(token)
+        if not tokens:
+            raise pp.ParseException(value, 0, 'Expected end of text')
+        return tokens
+
+    def _item(self, value, pos):
+        if value.startswith(self._ref_open, pos):
+            try:
+                return self._reference(value, pos, False)
+            except self._NoMatch:
+                pass
+        if value.startswith(self._inv_open, pos):
+            try:
+                return self._export(value, pos)
+            except self._NoMatch:
+                pass
+        return self._string(value, pos, self._escapes, self._top_content)
+
+    def _skip_whitespace(self, value, pos):
+        while pos < len(value) and value[pos] in self._whitespace:
+            pos += 1
+        return pos
+
+    def _reference(self, value, pos, nested):
+        # The grammar for the items of a reference is a pyparsing Forward,
+        # which leaveWhitespace() does not reach, so whitespace is skipped
+        # before every item, and before the end of nested references.
+        pos += len(self._ref_open)
+        items = []
+        while True:
+            start = self._skip_whitespace(value, pos)
+            try:
+                if value.startswith(self._ref_open, start):
+                    token, pos = self._reference(value, start, True)
+                else:
+                    token, pos = self._string(value, start, self._ref_escapes,
+                                              self._ref_content)
+            except self._NoMatch:
+                break
+            items.append(token)
+        if nested:
+            pos = self._skip_whitespace(value, pos)
+        if not items or not value.startswith(self._ref_close, pos):
+            raise self._NoMatch(pos)
+        return (tags.REF, items), pos + len(self._ref_close)
+
+    def _export(self, value, pos):
+        pos += len(self._inv_open)
+        items = []
+        while True:
+            try:
+                token, pos = self._string(value, pos, self._inv_escapes,
+                                          self._inv_content)
+            except self._NoMatch:
+                break
+            items.append(token)
+        if not items or not value.startswith(self._inv_close, pos):
+            raise self._NoMatch(pos)
+        return (tags.INV, items), pos + len(self._inv_close)
+
+    def _string(self, value, pos, escapes, content):
+        if value.startswith(self._double_esc, pos):
+            after = pos + len(self._double_esc)
+            for sentinel in self._sentinels:
+                if value.startswith(sentinel, after):
+                    return (tags.STR, self._esc), after
+        for escaped, sentinel in escapes:
+            if value.startswith(escaped, pos):
+                return (tags.STR, sentinel), pos + len(escaped)
+        end = content(value, pos)
+        if end == pos:
+            raise self._NoMatch(pos)
+        return (tags.STR, value[pos:end]), end
+
+    def _top_content(self, value, pos):
+        while pos < len(value) and not value.startswith(self._stops, pos):
+            pos += 1
+        return pos
+
+    def _ref_content(self, value, pos):
+        close_first = self._ref_close[0]
+        while (pos < len(value) and value[pos] != close_first and
+               not value.startswith(self._ref_stops, pos)):
+            pos += 1
+        return pos
+
+    def _inv_content(self, value, pos):
+        # mirrors CharsNotIn(close_first) in the grammar: the stops are only
+        # checked before each run of characters
+        close_first = self._inv_close[0]
+        while pos < len(value) and not value.startswith(self._inv_stops, pos):
+            end = value.find(close_first, pos)
+            if end == -1:
+                end = len(value)
+            if end == pos:
+                break
+            pos = end
+        return pos
+
+
+def get_ref_scanner(settings):
+    return _RefScanner(settings)
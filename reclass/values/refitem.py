@@ -11,6 +11,8 @@ from reclass.errors import ResolveError
 
 class RefItem(item.ItemWithReferences):
 
+    __slots__ = ()
+
     type = item.ItemTypes.REFERENCE
 
     def assembleRefs(self, context={}):
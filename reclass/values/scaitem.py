@@ -14,6 +14,8 @@ from reclass.values import item
 
 class ScaItem(item.Item):
 
+    __slots__ = ()
+
     type = item.ItemTypes.SCALAR
 
     def __init__(self, value, settings):
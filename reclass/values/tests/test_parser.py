@@ -0,0 +1,81 @@
+from reclass.errors import ConfigError
+from reclass.settings import Settings
+from reclass.values.parser import Parser
+from reclass.values.refitem import RefItem
+from reclass.values.compitem import CompItem
+import unittest
+
+SETTINGS = Settings()
+
+class TestParser(unittest.TestCase):
+
+    def test_parse_cache(self):
+        parser = Parser()
+        first = parser.parse('${foo:bar}', SETTINGS)
+        second = parser.parse('${foo:bar}', SETTINGS)
+        self.assertIsInstance(second, RefItem)
+        self.assertIsNot(first, second)
+        self.assertEqual(second.render({'foo': {'bar': 1}}, {}), 1)
+        self.assertEqual(parser.cache_info(), (1, 1, 10000, 1))
+
+    def test_parse_cache_scalars_not_cached(self):
+        parser = Parser()
+        parser.parse('foo', SETTINGS)
+        self.assertEqual(parser.cache_info(), (0, 0, 0, 0))
+
+    def test_parse_cache_settings(self):
+        parser = Parser()
+        other = Settings({'reference_sentinels': ('${', '}'), 'export_sentinels': ('$(', ')')})
+        parser.parse('${foo}-$[ exports:a ]', SETTINGS)
+        item = parser.parse('${foo}-$[ exports:a ]', other)
+        self.assertIsInstance(item, CompItem)
+        self.assertEqual(item.render({'foo': 'x'}, {}), 'x-$[ exports:a ]')
+        self.assertEqual(parser.cache_info().misses, 2)
+
+    def test_parse_cache_lru(self):
+        parser = Parser()
+        settings = Settings({'parse_cache_size': 2})
+        for value in ('${a}', '${b}', '${a}', '${c}', '${a}', '${b}'):
+            parser.parse(value, settings)
+        self.assertEqual(parser.cache_info(), (2, 4, 2, 2))
+
+    def test_parse_cache_disabled(self):
+        parser = Parser()
+        settings = Settings({'parse_cache_size': 0})
+        parser.parse('${a}', settings)
+        parser.parse('${a}', settings)
+        self.assertEqual(parser.cache_info(), (0, 2, 0, 0))
+
+    def test_unknown_reference_parser(self):
+        with self.assertRaises(ConfigError):
+            Settings({'reference_parser': 'bogus'})
+
+    def test_grammar_shared(self):
+        first = Parser()
+        second = Parser()
+        first.parse('${a}${b}', Settings({'jobs': 2}))
+        second.parse('${a}${b}', Settings({'jobs': 2}))
+        self.assertIs(first.ref_parser, second.ref_parser)
+        # settings which do not change the grammar share it too
+        second.parse('${a}${b}', Settings({'jobs': 4}))
+        self.assertIs(first.ref_parser, second.ref_parser)
+        second.parse('${a}${b}', Settings({'escape_character': '!'}))
+        self.assertIsNot(first.ref_parser, second.ref_parser)
+
+    def test_settings_immutable(self):
+        settings = Settings({'jobs': 2})
+        self.assertEqual(settings, Settings({'jobs': 2}))
+        self.assertEqual(hash(settings), hash(Settings({'jobs': 2})))
+        self.assertNotEqual(settings, SETTINGS)
+        with self.assertRaises(AttributeError):
+            settings.jobs = 3
+
+    def test_settings_sequences_immutable(self):
+        settings = Settings({'ignore_class_notfound_regexp': ['a.*', 'b.*']})
+        self.assertEqual(settings.ignore_class_notfound_regexp, ('a.*', 'b.*'))
+        self.assertIsInstance(settings.dict_key_prefixes, tuple)
+        with self.assertRaises(AttributeError):
+            settings.ignore_class_notfound_regexp.append('c.*')
+
+if __name__ == '__main__':
+    unittest.main()
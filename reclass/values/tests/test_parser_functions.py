@@ -1,5 +1,7 @@
 from reclass import settings
 from reclass.values import parser_funcs as pf
+import pyparsing as pp
+import random
 import unittest
 import ddt
 
@@ -112,5 +114,65 @@ class TestSimpleRefParser(unittest.TestCase):
         self.assertEquals(expected, result)
 
 
+# Strings the reference scanner is compared against the pyparsing reference
+# parser with, for both the tokens and whether parsing fails.
+test_scanner_corpus = (
+    r'\${foo}', r'\\${foo}', r'\\\${foo}', r'${foo\}}', r'${foo\\}',
+    r'\$[foo]', r'\\$[foo]', r'$[foo\]]', r'$[foo\\]', r'$[ foo\] ]',
+    r'${foo\${bar}}', r'${foo:${bar:${baz}}}', r'${${foo}}', r'${ foo }',
+    r'${ ${foo} }', r'${foo${ bar }}', r'${foo ${bar}}', r'${foo\} bar}',
+    r'${foo${bar\} }}', r'${foo\} }', r'${ }', r'${}', r'$[]', r'${foo',
+    r'$[foo', r'foo}', r'foo]', r'${foo}}', r'$[foo]]', r'$${foo}',
+    r'${foo$[bar]}', r'$[${foo}]', r'$[ exports:a if exports:b == ${c} ]',
+    'a\t${foo}\tb', '${\tfoo}', '${\nfoo}', r'\}', r'\\}', r'\\',
+    r'$\{foo}', '${foo}\\', r'${foo:bar}\\', r'${foo\$[bar]}',
+)
+
+def _random_corpus(settings, count=2000, seed=0):
+    ref_open, ref_close = settings.reference_sentinels
+    inv_open, inv_close = settings.export_sentinels
+    esc = settings.escape_character
+    alphabet = list('ab :\t') + [ref_open, ref_close, inv_open, inv_close,
+                                   esc, esc + esc, ref_close[0], inv_close[0]]
+    rnd = random.Random(seed)
+    return [''.join(rnd.choice(alphabet) for _ in range(rnd.randint(1, 12)))
+            for _ in range(count)]
+
+
+@ddt.ddt
+class TestRefScanner(unittest.TestCase):
+
+    def _compare(self, settings, instrings):
+        parser = pf.get_ref_parser(settings)
+        scanner = pf.get_ref_scanner(settings)
+        for instring in instrings:
+            try:
+                expected = pf.listify(parser.parseString(instring))
+            except pp.ParseException:
+                expected = None
+            try:
+                result = scanner.scan(instring)
+            except pp.ParseException:
+                result = None
+            self.assertEqual(expected, result, instring)
+
+    @ddt.data(*test_pairs_full)
+    def test_reference_scanner(self, data):
+        instring, expected = data
+        self.assertEqual(expected, pf.get_ref_scanner(SETTINGS).scan(instring))
+
+    def test_reference_scanner_corpus(self):
+        self._compare(SETTINGS, test_scanner_corpus)
+
+    def test_reference_scanner_random(self):
+        self._compare(SETTINGS, _random_corpus(SETTINGS))
+
+    def test_reference_scanner_random_sentinels(self):
+        custom = settings.Settings({'reference_sentinels': ('{{', '}}'),
+                                    'export_sentinels': ('{%', '%}'),
+                                    'escape_character': '^'})
+        self._compare(custom, _random_corpus(custom, count=1000, seed=1))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -14,6 +14,7 @@ from __future__ import unicode_literals
 from reclass.settings import Settings
 from reclass.values.value import Value
 from reclass.errors import ResolveError, ParseError
+import pickle
 import unittest
 
 SETTINGS = Settings()
@@ -127,5 +128,12 @@ class TestValue(unittest.TestCase):
         with self.assertRaises(ParseError):
             tv = Value(s, SETTINGS, '')
 
+    def test_pickle(self):
+        # parameters are pickled to and from the workers of a parallel run
+        s = 'my ' + _var('motd:greeting')
+        tv = pickle.loads(pickle.dumps(Value(s, SETTINGS, 'uri'), 2))
+        self.assertEqual(tv.uri, 'uri')
+        self.assertEqual(tv.render(CONTEXT, None), 'my Servus!')
+
 if __name__ == '__main__':
     unittest.main()
@@ -18,6 +18,8 @@ from six import string_types
 
 class Value(object):
 
+    __slots__ = ('_settings', 'uri', 'overwrite', 'constant', '_item')
+
     _parser = Parser()
 
     def __init__(self, value, settings, uri, parse_string=True):
@@ -11,41 +11,60 @@ from __future__ import unicode_literals
 import copy
 import sys
 
+from six import iteritems, string_types
+
 from reclass.errors import ChangedConstantError, ResolveError, TypeMergeError
+from .value import Value
 
 
 class ValueList(object):
 
+    __slots__ = ('_settings', '_refs', 'allRefs', '_values', '_inv_refs',
+                 'has_inv_query', 'ignore_failed_render', 'is_complex',
+                 '_item_type')
+
     def __init__(self, value, settings):
         self._settings = settings
         self._refs = []
         self.allRefs = True
-        self._values = [value]
+        self._values = []
         self._inv_refs = []
         self.has_inv_query = False
         self.ignore_failed_render = False
         self.is_complex = False
-        self._update()
+        self._update([value])
 
     @property
     def uri(self):
         return '; '.join([str(x.uri) for x in self._values])
 
     def append(self, value):
-        self._values.append(value)
-        self._update()
+        self._update([value])
 
     def extend(self, values):
-        self._values.extend(values._values)
-        self._update()
-
-    def _update(self):
-        self.assembleRefs()
-        self._check_for_inv_query()
-        self.is_complex = False
-        item_type = self._values[0].item_type()
-        for v in self._values:
-            if v.is_complex or v.constant or v.overwrite or v.item_type() != item_type:
+        self._update(list(values._values))
+
+    def _update(self, values):
+        # a key overridden in many classes is appended to many times, so
+        # only look at the new values and keep the rest of the state
+        if len(self._values) == 0:
+            self._item_type = values[0].item_type()
+        for value in values:
+            self._values.append(value)
+            value.assembleRefs({})
+            if value.has_references:
+                self._refs.extend(value.get_references())
+            if value.allRefs is False:
+                self.allRefs = False
+            if value.has_inv_query:
+                self._inv_refs.extend(value.get_inv_references())
+                if self.has_inv_query is False:
+                    self.has_inv_query = True
+                    self.ignore_failed_render = True
+                if value.ignore_failed_render() is False:
+                    self.ignore_failed_render = False
+            if (value.is_complex or value.constant or value.overwrite or
+                    value.item_type() != self._item_type):
                 self.is_complex = True
 
     @property
@@ -58,18 +77,6 @@ class ValueList(object):
     def get_references(self):
         return self._refs
 
-    def _check_for_inv_query(self):
-        self.has_inv_query = False
-        self.ignore_failed_render = True
-        for value in self._values:
-            if value.has_inv_query:
-                self._inv_refs.extend(value.get_inv_references())
-                self.has_inv_query = True
-                if value.ignore_failed_render() is False:
-                    self.ignore_failed_render = False
-        if self.has_inv_query is False:
-            self.ignore_failed_render = False
-
     def assembleRefs(self, context={}):
         self._refs = []
         self.allRefs = True
@@ -133,10 +140,16 @@ class ValueList(object):
             else:
                 if isinstance(output, dict):
                     if isinstance(new, dict):
-                        p1 = Parameters(output, self._settings, None, parse_strings=False)
-                        p2 = Parameters(new, self._settings, None, parse_strings=False)
-                        p1.merge(p2)
-                        output = p1.as_dict()
+                        merged = None
+                        prefixes = self._settings.dict_key_prefixes
+                        if _is_plain_dict(output, prefixes):
+                            merged = _merge_plain_dicts(output, new, prefixes)
+                        if merged is None:
+                            p1 = Parameters(output, self._settings, None, parse_strings=False)
+                            p2 = Parameters(new, self._settings, None, parse_strings=False)
+                            p1.merge(p2)
+                            merged = p1.as_dict()
+                        output = merged
                     elif isinstance(new, list):
                         raise TypeMergeError(self._values[n], self._values[n-1], self.uri)
                     elif self._settings.allow_scalar_over_dict or (self._settings.allow_none_override and new is None):
@@ -184,3 +197,51 @@ class ValueList(object):
             raise last_error
 
         return output
+
+
+def _is_plain_key(key, prefixes):
+    # Parameters.merge turns keys into strings and acts on the prefixes
+    return (isinstance(key, string_types) and len(key) > 0
+            and key[0] not in prefixes)
+
+
+def _is_plain_dict(dictionary, prefixes):
+    for key, value in iteritems(dictionary):
+        if not _is_plain_key(key, prefixes):
+            return False
+        if isinstance(value, dict) and not _is_plain_dict(value, prefixes):
+            return False
+    return True
+
+
+def _merge_plain_dicts(cur, new, prefixes):
+    '''
+    Returns the rendered dict new merged over the rendered dict cur, as
+    merging them as Parameters does, without wrapping every value in a Value
+    first. cur is not changed, and must be a plain dict (_is_plain_dict).
+
+    Returns None if the merge needs more than that: keys with prefixes or
+    that are not strings, values of different types under the same key, and
+    values which are not rendered yet. Parameters.merge deals with those.
+    '''
+    result = dict(cur)
+    for key, value in iteritems(new):
+        if not _is_plain_key(key, prefixes):
+            return None
+        if key not in result:
+            if isinstance(value, dict) and not _is_plain_dict(value, prefixes):
+                return None
+            result[key] = value
+            continue
+        old = result[key]
+        if isinstance(old, dict) and isinstance(value, dict):
+            value = _merge_plain_dicts(old, value, prefixes)
+            if value is None:
+                return None
+        elif isinstance(old, list) and isinstance(value, list):
+            value = old + value
+        elif (isinstance(old, (dict, list, Value, ValueList)) or
+                isinstance(value, (dict, list, Value, ValueList))):
+            return None
+        result[key] = value
+    return result